@@ -0,0 +1,122 @@
+import numpy as np
+
+from NumpyStage import NumpyStage, apply_rule, block_totals
+from Rule import CONWAY, compile_rule
+
+
+class BatchStage:
+    def __init__(self, count, height, width, rule=CONWAY):
+        """Initialize a batch of independent boards stepped together.
+
+        All boards share one contiguous (count, height, width) bool array
+        and advance with a single vectorized step, which avoids a Python
+        loop per board when running thousands of small soups.
+
+        Args:
+            count (int): Number of boards in the batch
+            height (int): Number of rows in each board
+            width (int): Number of columns in each board
+            rule (str): Rule string such as "B3/S23", or a compiled Rule
+        """
+        self.height = height  # Number of rows per board
+        self.width = width  # Number of columns per board
+        self.rule = rule
+        self.grids = np.zeros((count, height, width), dtype=bool)
+        self.board_ids = np.arange(count)  # Original index of each board
+        self.generation = 0
+
+        # Per-board results of the last step
+        self.populations = np.zeros(count, dtype=np.int64)
+        self.changed = np.ones(count, dtype=bool)
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @rule.setter
+    def rule(self, rule):
+        self._rule = compile_rule(rule)
+
+    @property
+    def count(self):
+        return len(self.grids)
+
+    def randomize(self, density=0.5, seed=None):
+        """Fill every board with a random soup.
+
+        Args:
+            density (float): Chance that each cell starts alive
+            seed (int): Seed for the random generator, for repeatable runs
+        """
+        rng = np.random.default_rng(seed)
+        self.grids = rng.random(self.grids.shape) < density
+        self.populations = np.count_nonzero(self.grids, axis=(1, 2))
+        self.changed[:] = True
+
+    def generate_next_grids(self):
+        """Apply the rule to advance every board by one generation."""
+        next_grids = apply_rule(self.rule, self.grids, block_totals(self.grids))
+        self.changed = (next_grids != self.grids).any(axis=(1, 2))
+        self.populations = np.count_nonzero(next_grids, axis=(1, 2))
+        self.grids = next_grids
+        self.generation += 1
+
+    def drop(self, finished):
+        """Remove boards from the batch so later steps skip them.
+
+        Args:
+            finished (numpy.ndarray): Bool mask over the current boards
+
+        Returns:
+            tuple: (board_ids, grids) of the removed boards
+        """
+        finished = np.asarray(finished, dtype=bool)
+        removed = (self.board_ids[finished], self.grids[finished])
+        keep = ~finished
+        self.grids = self.grids[keep]
+        self.board_ids = self.board_ids[keep]
+        self.populations = self.populations[keep]
+        self.changed = self.changed[keep]
+        return removed
+
+    def to_stage(self, index):
+        """Copy one board into a NumpyStage, e.g. to display it.
+
+        Args:
+            index (int): Position of the board in the current batch
+
+        Returns:
+            NumpyStage: Stage holding a copy of the board
+        """
+        stage = NumpyStage(self.height, self.width, self.rule)
+        stage.current_grid = self.grids[index].copy()
+        return stage
+
+
+if __name__ == "__main__":
+    import time
+
+    from Stage import Stage
+
+    # Compare total throughput with stepping separate Stage objects
+    size, generations = 64, 20
+    batch = BatchStage(10_000, size, size)
+    batch.randomize(0.3, seed=1)
+    start = time.perf_counter()
+    for generation in range(generations):
+        batch.generate_next_grids()
+    elapsed = time.perf_counter() - start
+    cells = batch.count * size * size * generations
+    print(f"BatchStage x{batch.count}: {cells / elapsed:,.0f} cells/s")
+
+    for stage_class, count in ((NumpyStage, 1000), (Stage, 10)):
+        stages = [stage_class(size, size) for board in range(count)]
+        for index, stage in enumerate(stages):
+            stage.current_grid = batch.grids[index].tolist()
+        start = time.perf_counter()
+        for generation in range(generations):
+            for stage in stages:
+                stage.generate_next_grid()
+        elapsed = time.perf_counter() - start
+        cells = count * size * size * generations
+        print(f"{stage_class.__name__} x{count}: {cells / elapsed:,.0f} cells/s")
@@ -0,0 +1,338 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import selectors
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import product
+
+import numpy as np
+
+from Patterns import RLEReader, load_pattern
+from Rule import CONWAY
+from Stage import BACKENDS, create_stage
+
+# Allocations made in these files are not counted as a stage's blocks:
+# this module and tracemalloc themselves, and the thread, queue, selector
+# and multiprocessing machinery that backends stepping out of process,
+# such as StripedStage, use to collect their workers' results. "<string>"
+# is the code namedtuple generates, such as selectors' SelectorKey. Those
+# blocks vary from run to run with thread timing, not with the stepping.
+UNCOUNTED_FILES = (
+    __file__,
+    tracemalloc.__file__,
+    threading.__file__,
+    queue.__file__,
+    selectors.__file__,
+    "<string>",
+)
+UNCOUNTED_DIRECTORIES = (os.path.dirname(multiprocessing.__file__) + os.sep,)
+
+# Seed patterns besides random soup, as RLE
+PATTERNS = {
+    "glider_gun": (
+        b"x = 36, y = 9, rule = B3/S23\n"
+        b"24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4b"
+        b"obo$10bo5bo7bo$11bo3bo$12b2o!\n"
+    ),
+    "r_pentomino": b"x = 3, y = 3, rule = B3/S23\nb2o$2o$bo!\n",
+    "acorn": b"x = 7, y = 3, rule = B3/S23\nbo$3bo$2o2b3o!\n",
+}
+SOUP = "soup"
+
+# Largest board, in cells, each backend is benchmarked on; the pure Python
+# loop and the live cell set would take minutes per generation beyond these
+BACKEND_LIMITS = {"python": 256 * 256, "sparse": 1024 * 1024}
+
+DEFAULT_SIZES = (64, 256, 1024, 4096, 8192)
+DEFAULT_DENSITIES = (0.1, 0.3, 0.5)
+DEFAULT_RULES = (CONWAY, "B36/S23")
+DEFAULT_PATTERNS = (SOUP, "glider_gun", "r_pentomino")
+
+# Fields that identify a benchmark case across runs
+CASE_FIELDS = ("backend", "size", "pattern", "density", "rule")
+
+
+def build_stage(backend, size, pattern, density, rule, seed=0):
+    """Create a square stage holding a random soup or a centred pattern."""
+    stage = create_stage(size, size, backend, rule=rule)
+    if pattern == SOUP:
+        board = np.random.default_rng(seed).random((size, size)) < density
+        stage.from_array(board)
+    else:
+        header = RLEReader(io.BytesIO(PATTERNS[pattern]))
+        top = max(size - header.height, 0) // 2
+        left = max(size - header.width, 0) // 2
+        load_pattern(stage, io.BytesIO(PATTERNS[pattern]), top, left)
+    return stage
+
+
+def close_stage(stage):
+    """Release the worker processes or shared memory a stage holds."""
+    close = getattr(stage, "close", None)
+    if close:
+        close()
+
+
+def measure_speed(stage, min_time=0.5, max_generations=1000):
+    """Step a stage until min_time has passed or max_generations have run.
+
+    One untimed generation is run first so tables and buffers are built.
+
+    Returns:
+        tuple: (generations run, seconds taken)
+    """
+    stage.generate_next_grid()
+    generations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while generations < max_generations and elapsed < min_time:
+        stage.generate_next_grid()
+        generations += 1
+        elapsed = time.perf_counter() - start
+    return generations, elapsed
+
+
+def counted_file(filename):
+    """Whether blocks allocated in a file count towards allocated_blocks."""
+    return filename not in UNCOUNTED_FILES and not filename.startswith(
+        UNCOUNTED_DIRECTORIES
+    )
+
+
+def measure_memory(make_stage, generations=3):
+    """Trace the memory a stage holds and allocates while stepping.
+
+    Only allocations made through Python's allocators are traced, which
+    includes NumPy arrays but not shared memory or memory-mapped files.
+    Allocations are counted from a snapshot diff around the first traced
+    generation, taken while the stage's old attributes are held so nothing
+    the stage held before is freed: every block added in between was made
+    by the generation. Temporaries freed before it returns are not
+    counted, but their bytes show in peak_bytes.
+
+    Args:
+        make_stage (callable): Builds the stage to measure
+        generations (int): Generations stepped under tracing
+
+    Returns:
+        dict: state_bytes held by the built stage, peak_bytes allocated on
+        top of that during a generation, and allocated_blocks, the memory
+        blocks a generation allocates that outlive it
+    """
+    tracemalloc.start()
+    try:
+        stage = make_stage()
+        stage.generate_next_grid()
+        state_bytes, peak = tracemalloc.get_traced_memory()
+        peak_bytes = 0
+        for generation in range(generations):
+            if generation == 0:
+                held = list(vars(stage).values())
+                before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            stage.generate_next_grid()
+            current, peak = tracemalloc.get_traced_memory()
+            peak_bytes = max(peak_bytes, peak - state_bytes)
+            if generation == 0:
+                after = tracemalloc.take_snapshot()
+                del held
+        allocated_blocks = sum(
+            max(stat.count_diff, 0)
+            for stat in after.compare_to(before, "filename")
+            if counted_file(stat.traceback[0].filename)
+        )
+        close_stage(stage)
+    finally:
+        tracemalloc.stop()
+    return {
+        "state_bytes": state_bytes,
+        "peak_bytes": peak_bytes,
+        "allocated_blocks": allocated_blocks,
+    }
+
+
+def cases(backends, sizes, densities, rules, patterns):
+    """List the (backend, size, pattern, density, rule) cases to run.
+
+    Density only varies for random soup and is None for fixed patterns.
+    Boards larger than a backend's BACKEND_LIMITS entry are left out.
+    """
+    matrix = []
+    for backend, size, rule, pattern in product(backends, sizes, rules, patterns):
+        if size * size > BACKEND_LIMITS.get(backend, size * size):
+            continue
+        for density in densities if pattern == SOUP else (None,):
+            matrix.append((backend, size, pattern, density, rule))
+    return matrix
+
+
+def run_benchmarks(matrix, min_time=0.5, max_generations=1000, report=print):
+    """Time and trace every case in a benchmark matrix.
+
+    Args:
+        matrix (list): Cases from cases()
+        min_time (float): Least seconds each case is timed for
+        max_generations (int): Most generations each case is timed for
+        report (callable): Receives one line per finished case
+
+    Returns:
+        list: One result dict per case
+    """
+    results = []
+    for backend, size, pattern, density, rule in matrix:
+
+        def make_stage():
+            return build_stage(backend, size, pattern, density, rule)
+
+        memory = measure_memory(make_stage)
+        stage = make_stage()
+        try:
+            generations, elapsed = measure_speed(stage, min_time, max_generations)
+        finally:
+            close_stage(stage)
+
+        result = {
+            "backend": backend,
+            "size": size,
+            "pattern": pattern,
+            "density": density,
+            "rule": rule,
+            "generations": generations,
+            "seconds": elapsed,
+            "cells_per_second": size * size * generations / elapsed,
+            **memory,
+        }
+        results.append(result)
+        report(
+            f"{backend:>8} {size:>5}x{size:<5} {pattern:>11} "
+            f"{density if density is not None else '':>4} {rule:>8}: "
+            f"{result['cells_per_second']:>16,.0f} cells/s, "
+            f"peak {result['peak_bytes'] / 2**20:>8,.1f} MiB, "
+            f"{result['allocated_blocks']:>10,.0f} blocks"
+        )
+    return results
+
+
+def save_results(results, path):
+    """Write benchmark results and the machine they ran on as JSON."""
+    document = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "processor": platform.processor(),
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(document, file, indent=1)
+
+
+def compare_results(baseline, candidate, threshold=0.1):
+    """Find the cases that got slower or hungrier between two runs.
+
+    Args:
+        baseline (list): Results of the earlier run
+        candidate (list): Results of the later run
+        threshold (float): Relative change treated as a regression
+
+    Returns:
+        list: (case, metric, old value, new value) of each regression
+    """
+    old = {tuple(result[field] for field in CASE_FIELDS): result for result in baseline}
+    regressions = []
+    for result in candidate:
+        case = tuple(result[field] for field in CASE_FIELDS)
+        if case not in old:
+            continue
+        before = old[case]
+        if result["cells_per_second"] < before["cells_per_second"] * (1 - threshold):
+            regressions.append(
+                (
+                    case,
+                    "cells_per_second",
+                    before["cells_per_second"],
+                    result["cells_per_second"],
+                )
+            )
+        # Ignore growth below a page, which is noise rather than a regression
+        if result["peak_bytes"] > before["peak_bytes"] * (1 + threshold) + 4096:
+            regressions.append(
+                (case, "peak_bytes", before["peak_bytes"], result["peak_bytes"])
+            )
+        # Likewise a block or two, such as a changed_cells tuple
+        if (
+            result["allocated_blocks"]
+            > before["allocated_blocks"] * (1 + threshold) + 2
+        ):
+            regressions.append(
+                (
+                    case,
+                    "allocated_blocks",
+                    before["allocated_blocks"],
+                    result["allocated_blocks"],
+                )
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stepping engines")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark matrix")
+    run_parser.add_argument("output", help="JSON file to write the results to")
+    run_parser.add_argument(
+        "--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS)
+    )
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    run_parser.add_argument(
+        "--densities", nargs="+", type=float, default=DEFAULT_DENSITIES
+    )
+    run_parser.add_argument("--rules", nargs="+", default=DEFAULT_RULES)
+    run_parser.add_argument(
+        "--patterns",
+        nargs="+",
+        choices=(SOUP, *PATTERNS),
+        default=DEFAULT_PATTERNS,
+    )
+    run_parser.add_argument("--min-time", type=float, default=0.5)
+    run_parser.add_argument("--max-generations", type=int, default=1000)
+
+    compare_parser = commands.add_parser(
+        "compare", help="flag regressions between two result files"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative change to flag"
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        matrix = cases(
+            args.backends, args.sizes, args.densities, args.rules, args.patterns
+        )
+        results = run_benchmarks(matrix, args.min_time, args.max_generations)
+        save_results(results, args.output)
+        print(f"{len(results):,} results written to {args.output}")
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        with open(args.candidate) as file:
+            candidate = json.load(file)["results"]
+        regressions = compare_results(baseline, candidate, args.threshold)
+        for case, metric, before, after in regressions:
+            change = (after - before) / before if before else float("inf")
+            print(
+                f"{' '.join(map(str, case))}: {metric} {before:,.0f} -> {after:,.0f} ({change:+.1%})"
+            )
+        print(f"{len(regressions):,} regressions")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,222 @@
+import numpy as np
+
+from Rule import CONWAY
+from Stage import GridView, Stage
+
+WORD_BITS = 64
+ONE = np.uint64(1)
+HIGH_BIT = np.uint64(WORD_BITS - 1)
+
+
+class BitStage(Stage):
+    def __init__(self, height, width, rule=CONWAY):
+        """Initialize a bit-packed game stage.
+
+        Each row is stored as ceil(width / 64) uint64 words, one bit per
+        cell, with column ``col`` at bit ``col % 64`` of word ``col // 64``.
+        Bits past the last column are kept clear.
+
+        Args:
+            height (int): Number of rows in the grid
+            width (int): Number of columns in the grid
+            rule (str): Rule string such as "B3/S23", or a compiled Rule
+        """
+        self.height = height  # Number of rows
+        self.width = width  # Number of columns
+        self.rule = rule
+        self.word_count = -(-width // WORD_BITS)  # Words per row
+
+        # Position of the last column inside the last word of a row
+        self.last_bit = np.uint64((width - 1) % WORD_BITS)
+        self.last_mask = np.uint64((1 << (int(self.last_bit) + 1)) - 1)
+
+        self.words = self.blank_grid()
+
+    @property
+    def current_grid(self):
+        return GridView(self)
+
+    @current_grid.setter
+    def current_grid(self, grid):
+        if isinstance(grid, GridView):
+            grid = grid.stage.to_array()
+        if isinstance(grid, np.ndarray) and grid.dtype == np.uint64:
+            self.words = grid
+        else:
+            self.words = self.pack(grid)
+
+    def blank_grid(self):
+        """Create an empty packed grid with the correct dimensions.
+
+        Returns:
+            numpy.ndarray: (height, word_count) uint64 array of dead cells
+        """
+        return np.zeros((self.height, self.word_count), dtype=np.uint64)
+
+    def get_cell(self, row, col):
+        col %= self.width
+        return bool((int(self.words[row, col >> 6]) >> (col & 63)) & 1)
+
+    def set_cell(self, row, col, alive):
+        col %= self.width
+        bit = np.uint64(1 << (col & 63))
+        if alive:
+            self.words[row, col >> 6] |= bit
+        else:
+            self.words[row, col >> 6] &= ~bit
+
+    def pack(self, grid):
+        """Pack a grid of booleans into words.
+
+        Args:
+            grid: 2D list or array of cell states, indexed [row][col]
+
+        Returns:
+            numpy.ndarray: (height, word_count) uint64 array
+        """
+        cells = np.zeros((self.height, self.word_count * WORD_BITS), dtype=bool)
+        cells[:, : self.width] = np.asarray(grid, dtype=bool)
+        packed = np.packbits(cells, axis=1, bitorder="little")
+        return packed.view("<u8").astype(np.uint64)
+
+    def unpack(self, words=None):
+        """Expand packed words into a bool array.
+
+        Args:
+            words (numpy.ndarray): Words to expand, defaults to the grid
+
+        Returns:
+            numpy.ndarray: (height, width) bool array of cell states
+        """
+        if words is None:
+            words = self.words
+        packed = words.astype("<u8").view(np.uint8)
+        cells = np.unpackbits(packed, axis=1, bitorder="little")
+        return cells[:, : self.width].view(bool)
+
+    def shift_west(self, rows):
+        """Move every cell one column right, wrapping the last column to 0.
+
+        After the shift, bit ``col`` holds the cell from column ``col - 1``.
+        """
+        carry = np.roll(rows, 1, axis=1) >> HIGH_BIT
+        shifted = (rows << ONE) | carry
+        wrapped = (rows[:, -1] >> self.last_bit) & ONE
+        shifted[:, 0] = (shifted[:, 0] & ~ONE) | wrapped
+        shifted[:, -1] &= self.last_mask
+        return shifted
+
+    def shift_east(self, rows):
+        """Move every cell one column left, wrapping column 0 to the last.
+
+        After the shift, bit ``col`` holds the cell from column ``col + 1``.
+        """
+        carry = np.roll(rows, -1, axis=1) << HIGH_BIT
+        shifted = (rows >> ONE) | carry
+        wrapped = (rows[:, 0] & ONE) << self.last_bit
+        shifted[:, -1] = (shifted[:, -1] & ~(ONE << self.last_bit)) | wrapped
+        shifted[:, -1] &= self.last_mask
+        return shifted
+
+    def generate_next_grid(self):
+        """Apply the stage's rule to generate the next generation.
+
+        Every word advances 64 cells at once. Each row is first summed with
+        its west and east neighbours into a 2-bit count (sum, carry). The
+        counts of the rows above, at and below each row are then added with
+        full adders into the bits of the 3x3 block total, centre included.
+        """
+        words = self.words
+        west = self.shift_west(words)
+        east = self.shift_east(words)
+
+        # Horizontal 3-cell sums: value = sums + 2 * carries
+        sums = west ^ words ^ east
+        carries = (west & words) | (east & (west ^ words))
+
+        sums_up, sums_down = np.roll(sums, 1, axis=0), np.roll(sums, -1, axis=0)
+        carries_up = np.roll(carries, 1, axis=0)
+        carries_down = np.roll(carries, -1, axis=0)
+
+        # Add the three rows' ones bits, then their twos bits
+        ones = sums_up ^ sums ^ sums_down
+        ones_carry = (sums_up & sums) | (sums_down & (sums_up ^ sums))
+        twos = carries_up ^ carries ^ carries_down
+        twos_carry = (carries_up & carries) | (carries_down & (carries_up ^ carries))
+
+        # Bits of the block total: ones + 2 * bit1 + 4 * bit2 + 8 * bit3
+        bit1 = ones_carry ^ twos
+        fours_carry = ones_carry & twos
+        bit2 = twos_carry ^ fours_carry
+        bit3 = twos_carry & fours_carry
+        total_bits = (ones, bit1, bit2, bit3)
+
+        # OR together the words where the block total gives a live cell
+        next_words = np.zeros_like(words)
+        for total, born, survives in self.rule.live_totals:
+            matches = ~np.zeros_like(words)
+            for bit, plane in enumerate(total_bits):
+                matches &= plane if total >> bit & 1 else ~plane
+            if not born:
+                matches &= words
+            elif not survives:
+                matches &= ~words
+            next_words |= matches
+        next_words[:, -1] &= self.last_mask
+        if self.track_changes:
+            self.changed_cells = np.nonzero(self.unpack(words ^ next_words))
+            self.births = int(np.count_nonzero(self.unpack(next_words & ~words)))
+            self.deaths = len(self.changed_cells[0]) - self.births
+        self.words = next_words
+
+    def read_region(self, top, left, height, width):
+        words = self.words[top : top + height]
+        return self.unpack(words)[:, left : left + width].copy()
+
+    def from_array(self, board):
+        self.words = self.pack(board)
+
+    def from_packed(self, words):
+        self.words = words
+
+    def live_coordinates(self):
+        return np.nonzero(self.unpack())
+
+    def cell_masks(self, rows, cols):
+        """Word index and bit mask of each cell.
+
+        Returns:
+            tuple: ((rows, word columns), uint64 masks) for indexing words
+        """
+        cols = np.asarray(cols, dtype=np.int64)
+        masks = ONE << (cols & (WORD_BITS - 1)).astype(np.uint64)
+        return (np.asarray(rows, dtype=np.int64), cols // WORD_BITS), masks
+
+    def set_cells(self, rows, cols):
+        index, masks = self.cell_masks(rows, cols)
+        np.bitwise_or.at(self.words, index, masks)
+
+    def flip(self, rows, cols):
+        index, masks = self.cell_masks(rows, cols)
+        np.bitwise_xor.at(self.words, index, masks)
+        return int(np.count_nonzero(self.words[index] & masks))
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    # Compare throughput with the pure Python loop on a random board
+    for stage_class, size, generations in ((Stage, 256, 3), (BitStage, 2048, 50)):
+        stage = stage_class(size, size)
+        stage.current_grid = [
+            [random.random() < 0.3 for col in range(size)] for row in range(size)
+        ]
+        start = time.perf_counter()
+        for generation in range(generations):
+            stage.generate_next_grid()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{stage_class.__name__:>8} {size}x{size}: "
+            f"{size * size * generations / elapsed:,.0f} cells/s"
+        )
@@ -0,0 +1,139 @@
+import struct
+
+import numpy as np
+
+from Patterns import board_rows, board_size
+from Rule import compile_rule
+from Stage import create_stage
+
+MAGIC = b"LIFEBRD1"
+VERSION = 1
+
+# Little-endian header: magic, version, header size, height, width,
+# generation, bytes per row, rule string. Padded to HEADER_SIZE bytes so
+# the rows after it start 8-byte aligned.
+HEADER = struct.Struct("<8sHHIIQI32s")
+HEADER_SIZE = 64
+
+# Rows packed and written at a time while saving
+ROW_BATCH = 256
+
+
+def row_words(width):
+    """Number of 64-bit words that hold one packed row."""
+    return -(-width // 64)
+
+
+def save_board(stage, path, generation=0):
+    """Write a stage's board to a bit-packed binary board file.
+
+    Each row is packed one bit per cell, column ``col`` at bit ``col % 64``
+    of little-endian word ``col // 64``, the same layout as BitStage. Rows
+    are read from the stage and packed ROW_BATCH at a time.
+
+    Args:
+        stage (Stage): Stage to save
+        path (str): File to write
+        generation (int): Generation number stored in the header
+    """
+    height, width = board_size(stage)
+    word_count = row_words(width)
+    rule = str(stage.rule).encode("ascii")
+    header = HEADER.pack(
+        MAGIC, VERSION, HEADER_SIZE, height, width, generation, word_count * 8, rule
+    )
+
+    with open(path, "wb") as file:
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        batch = np.zeros((ROW_BATCH, word_count * 64), dtype=bool)
+        filled = 0
+        for line in board_rows(stage):
+            batch[filled, :width] = line
+            filled += 1
+            if filled == ROW_BATCH:
+                np.packbits(batch, axis=1, bitorder="little").tofile(file)
+                filled = 0
+        np.packbits(batch[:filled], axis=1, bitorder="little").tofile(file)
+
+
+class BoardFile:
+    def __init__(self, path):
+        """Memory-mapped view of a binary board file.
+
+        Only the header is read here. Rows are paged in from disk as they
+        are touched, so a viewer can read a small region of a huge board
+        and a BitStage can step straight from the mapping.
+
+        Args:
+            path (str): Board file written by save_board
+        """
+        with open(path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+        if len(header) < HEADER.size or not header.startswith(MAGIC):
+            raise ValueError(f"{path} is not a board file")
+        fields = HEADER.unpack_from(header)
+        magic, version, header_size = fields[:3]
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported board file version {version}")
+
+        self.path = path
+        self.height, self.width, self.generation, row_bytes = fields[3:7]
+        self.rule = compile_rule(fields[7].rstrip(b"\0").decode("ascii"))
+        # (height, words per row) uint64 view of the packed rows
+        self.words = np.memmap(
+            path,
+            dtype="<u8",
+            mode="r",
+            offset=header_size,
+            shape=(self.height, row_bytes // 8),
+        )
+
+    def read_region(self, top, left, height, width):
+        """Unpack one rectangle of the board, touching only its rows and words.
+
+        Args:
+            top (int): First row of the region
+            left (int): First column of the region
+            height (int): Number of rows in the region
+            width (int): Number of columns in the region
+
+        Returns:
+            numpy.ndarray: (height, width) bool array, clipped to the board
+        """
+        bottom = min(top + height, self.height)
+        right = min(left + width, self.width)
+        first_word, last_word = left // 64, row_words(right)
+        words = np.ascontiguousarray(self.words[top:bottom, first_word:last_word])
+        packed = words.astype("<u8").view(np.uint8)
+        cells = np.unpackbits(packed, axis=1, bitorder="little").view(bool)
+        offset = left - first_word * 64
+        return cells[:, offset : offset + right - left]
+
+    def to_stage(self, backend="bits", **options):
+        """Create a stage holding the board.
+
+        The stage is handed a copy-on-write mapping of the packed rows
+        through Stage.from_packed. A BitStage keeps the mapping as its
+        words, so it starts stepping without reading the board first;
+        other backends unpack the whole board.
+
+        Args:
+            backend (str): Key of Stage.BACKENDS selecting the engine
+            **options: Extra keyword arguments for the backend's constructor
+
+        Returns:
+            Stage: Stage holding the board under the file's rule
+        """
+        stage = create_stage(
+            self.height, self.width, backend, rule=self.rule, **options
+        )
+        stage.from_packed(
+            np.memmap(
+                self.path,
+                dtype="<u8",
+                mode="c",
+                offset=self.words.offset,
+                shape=self.words.shape,
+            )
+        )
+        return stage
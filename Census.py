@@ -0,0 +1,248 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+from Objects import OBJECT_NAMES, find_components, object_code
+from Rule import CONWAY, compile_rule
+from SparseStage import SparseStage
+
+
+def is_settled(populations, max_period=30, min_span=60):
+    """Check whether the population history has become periodic.
+
+    Escaping gliders keep a settled soup from ever repeating exactly, but
+    they do not change its population, so the population sequence is
+    used. It must repeat with some period <= max_period over the last
+    max(min_span, 3 * period) generations.
+
+    Args:
+        populations (list): Population of every generation so far
+        max_period (int): Longest period to look for
+        min_span (int): Fewest generations the repetition must cover
+
+    Returns:
+        bool: True when the soup looks settled
+    """
+    for period in range(1, max_period + 1):
+        span = max(min_span, 3 * period)
+        if len(populations) < span + period:
+            return False
+        if populations[-span:] == populations[-span - period : -period]:
+            return True
+    return False
+
+
+def run_soup(rng, soup_size, density, rule, max_generations):
+    """Run one random soup on an unbounded plane until it settles.
+
+    Returns:
+        tuple: (settled, Counter of object codes left over)
+    """
+    stage = SparseStage(soup_size, soup_size, wrap=False, rule=rule)
+    stage.live_cells = {
+        (row, col)
+        for row in range(soup_size)
+        for col in range(soup_size)
+        if rng.random() < density
+    }
+
+    populations = [stage.population]
+    settled = False
+    for generation in range(max_generations):
+        stage.generate_next_grid()
+        populations.append(stage.population)
+        if generation % 10 == 0 and is_settled(populations):
+            settled = True
+            break
+
+    objects = Counter()
+    for component in find_components(stage.live_cells):
+        objects[object_code(component, rule)] += 1
+    return settled, objects
+
+
+def census_chunk(task):
+    """Worker task: run one chunk of soups with its own deterministic seed.
+
+    Soups are seeded from (seed, chunk), so a chunk always produces the
+    same soups whichever worker runs it, and a resumed run skips exactly
+    the chunks already counted.
+
+    Returns:
+        tuple: (chunk, object counts dict, soups run, soups unsettled)
+    """
+    seed, chunk, chunk_size, soup_size, density, rule, max_generations = task
+    rng = random.Random(f"{seed}:{chunk}")
+    objects = Counter()
+    unsettled = 0
+    for soup in range(chunk_size):
+        settled, soup_objects = run_soup(rng, soup_size, density, rule, max_generations)
+        objects.update(soup_objects)
+        unsettled += not settled
+    return chunk, dict(objects), chunk_size, unsettled
+
+
+class Census:
+    def __init__(
+        self,
+        path,
+        seed="census",
+        soup_size=16,
+        density=0.5,
+        rule=CONWAY,
+        chunk_size=100,
+        max_generations=5000,
+    ):
+        """Initialize a random-soup census, resuming from path if present.
+
+        Args:
+            path (str): JSON file the census table is written to
+            seed (str): Seed for the whole run; chunk n uses (seed, n)
+            soup_size (int): Side length of each random soup
+            density (float): Chance that each soup cell starts alive
+            rule (str): Rule string such as "B3/S23"
+            chunk_size (int): Soups per worker task and per seed
+            max_generations (int): Generations before a soup is given up
+        """
+        self.path = path
+        self.settings = {
+            "seed": seed,
+            "soup_size": soup_size,
+            "density": density,
+            "rule": compile_rule(rule).rulestring,
+            "chunk_size": chunk_size,
+            "max_generations": max_generations,
+        }
+        self.chunks_done = set()
+        self.soups = 0
+        self.unsettled = 0
+        self.objects = Counter()
+
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        """Resume from the census table at self.path."""
+        with open(self.path) as file:
+            saved = json.load(file)
+        if saved["settings"] != self.settings:
+            raise ValueError(
+                f"{self.path} was written with settings {saved['settings']}, "
+                f"not {self.settings}"
+            )
+        self.chunks_done = set(saved["chunks_done"])
+        self.soups = saved["soups"]
+        self.unsettled = saved["unsettled"]
+        self.objects = Counter(saved["objects"])
+
+    def save(self):
+        """Write the census table, replacing the old file atomically."""
+        table = {
+            "settings": self.settings,
+            "soups": self.soups,
+            "unsettled": self.unsettled,
+            "chunks_done": sorted(self.chunks_done),
+            "objects": dict(self.objects.most_common()),
+            "names": {
+                code: OBJECT_NAMES[code]
+                for code in self.objects
+                if code in OBJECT_NAMES
+            },
+        }
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(table, file, indent=1)
+        os.replace(temporary, self.path)
+
+    def run(self, soups, workers=None, save_interval=30.0, report=print):
+        """Run soups until the census holds at least the given number.
+
+        Results stream back from the workers one chunk at a time and the
+        table is saved every save_interval seconds and at the end, so an
+        interrupted run loses at most the chunks still in progress.
+
+        Args:
+            soups (int): Total soups the census should reach
+            workers (int): Worker processes, defaults to the number of CPUs
+            save_interval (float): Seconds between census table writes
+            report (callable): Receives a progress line after every save
+        """
+        settings = self.settings
+        chunk_size = settings["chunk_size"]
+        chunk_count = -(-soups // chunk_size)
+        tasks = [
+            (
+                settings["seed"],
+                chunk,
+                chunk_size,
+                settings["soup_size"],
+                settings["density"],
+                settings["rule"],
+                settings["max_generations"],
+            )
+            for chunk in range(chunk_count)
+            if chunk not in self.chunks_done
+        ]
+
+        start = last_save = time.perf_counter()
+        soups_this_run = 0
+        with multiprocessing.Pool(workers) as pool:
+            try:
+                for chunk, objects, count, unsettled in pool.imap_unordered(
+                    census_chunk, tasks
+                ):
+                    self.chunks_done.add(chunk)
+                    self.objects.update(objects)
+                    self.soups += count
+                    self.unsettled += unsettled
+                    soups_this_run += count
+
+                    now = time.perf_counter()
+                    if now - last_save >= save_interval:
+                        self.save()
+                        last_save = now
+                        report(self.progress(soups_this_run, now - start))
+            finally:
+                self.save()
+        report(self.progress(soups_this_run, time.perf_counter() - start))
+
+    def progress(self, soups_this_run, elapsed):
+        """Describe the census so far and this run's throughput."""
+        rate = soups_this_run / elapsed if elapsed else 0.0
+        return (
+            f"{self.soups:,} soups ({self.unsettled:,} unsettled), "
+            f"{sum(self.objects.values()):,} objects, {rate:,.1f} soups/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless random-soup census")
+    parser.add_argument("output", help="census JSON file, resumed if it exists")
+    parser.add_argument("--soups", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", default="census")
+    parser.add_argument("--soup-size", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--rule", default=CONWAY)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--save-interval", type=float, default=30.0)
+    args = parser.parse_args()
+
+    census = Census(
+        args.output,
+        seed=args.seed,
+        soup_size=args.soup_size,
+        density=args.density,
+        rule=args.rule,
+        chunk_size=args.chunk_size,
+    )
+    try:
+        census.run(args.soups, args.workers, args.save_interval)
+    except KeyboardInterrupt:
+        print(f"Interrupted; progress saved to {args.output}")
+    for code, count in census.objects.most_common(20):
+        print(f"{count:>10,}  {OBJECT_NAMES.get(code, code)}")
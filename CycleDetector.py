@@ -0,0 +1,140 @@
+from collections import deque
+
+import numpy as np
+
+# Constants of the splitmix64 mixing function
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def splitmix64(values):
+    """Scramble uint64 values into well-distributed 64-bit hashes."""
+    values = values + GOLDEN_GAMMA
+    values = (values ^ (values >> np.uint64(30))) * MIX_1
+    values = (values ^ (values >> np.uint64(27))) * MIX_2
+    return values ^ (values >> np.uint64(31))
+
+
+def cell_keys(rows, cols, seed=0):
+    """Zobrist keys of cells, computed from their coordinates.
+
+    Keys are hashed on demand rather than read from a stored table, so
+    unbounded boards and negative coordinates need no extra memory.
+
+    Args:
+        rows (sequence): Row of each cell
+        cols (sequence): Column of each cell, same length as rows
+        seed (int): Seed that selects a different family of keys
+
+    Returns:
+        numpy.ndarray: One uint64 key per cell
+    """
+    rows = np.asarray(rows, dtype=np.int64).astype(np.uint64)
+    cols = np.asarray(cols, dtype=np.int64).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        return splitmix64(splitmix64(rows ^ np.uint64(seed)) ^ cols)
+
+
+def combine_keys(keys):
+    """XOR keys together into one board hash."""
+    return int(np.bitwise_xor.reduce(keys)) if len(keys) else 0
+
+
+class CycleDetector:
+    def __init__(self, stage, history=256, seed=0):
+        """Follow a stage's board hash to spot extinction and oscillation.
+
+        The board hash is the XOR of a Zobrist key for every live cell, so
+        after each generation only the keys of the cells that flipped are
+        folded in. A dict from hash to generation over a bounded window of
+        recent generations then finds a repeat in O(1) per step. The empty
+        board hashes to 0.
+
+        Args:
+            stage (Stage): Stage to step; its change tracking is switched on
+            history (int): Most recent generations remembered
+            seed (int): Seed for the Zobrist keys
+        """
+        self.stage = stage
+        self.history = history  # Number of generations remembered
+        self.seed = seed
+        stage.track_changes = True
+        self.reset()
+
+    def reset(self, generation=0):
+        """Rehash the whole board and forget history, e.g. after edits.
+
+        Args:
+            generation (int): Generation number of the board as it stands
+        """
+        self.generation = generation
+        self.hash = combine_keys(cell_keys(*self.stage.live_coordinates(), self.seed))
+        self.recent = deque()  # (hash, generation) remembered, oldest first
+        self.seen = {}  # Hash -> latest generation it was seen at
+        self.period = None  # Length of the cycle once one is found
+        self.cycle_start = None  # First generation of that cycle
+        self.remember()
+
+    def remember(self):
+        """Record the current hash, forgetting the oldest one if full."""
+        if len(self.recent) == self.history:
+            oldest, generation = self.recent.popleft()
+            if self.seen[oldest] == generation:
+                del self.seen[oldest]
+        self.recent.append((self.hash, self.generation))
+        self.seen[self.hash] = self.generation
+
+    @property
+    def extinct(self):
+        return self.hash == 0
+
+    @property
+    def settled(self):
+        """True once the board is dead or a still life."""
+        return self.period == 1
+
+    def step(self):
+        """Advance the stage one generation and update the cycle state.
+
+        Returns:
+            int: The cycle period, or None while no repeat has been seen
+        """
+        self.stage.generate_next_grid()
+        self.hash ^= combine_keys(cell_keys(*self.stage.changed_cells, self.seed))
+        self.generation += 1
+
+        if self.period is None and self.hash in self.seen:
+            self.cycle_start = self.seen[self.hash]
+            self.period = self.generation - self.cycle_start
+        self.remember()
+        return self.period
+
+    def advance_to(self, generation):
+        """Bring the stage to a later generation.
+
+        Once a cycle is known, only (generation - current) % period steps
+        are run, so any generation is reached in fewer than period steps.
+
+        Args:
+            generation (int): Generation to reach, not before the current one
+
+        Returns:
+            int: Number of generations actually computed
+        """
+        if generation < self.generation:
+            raise ValueError(
+                f"Cannot go back from generation {self.generation} to {generation}"
+            )
+        steps = 0
+        while self.generation < generation:
+            if self.period is not None:
+                remaining = (generation - self.generation) % self.period
+                for step in range(remaining):
+                    self.step()
+                steps += remaining
+                self.generation = generation
+                break
+            self.step()
+            steps += 1
+        return steps
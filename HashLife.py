@@ -0,0 +1,339 @@
+from Rule import CONWAY, compile_rule
+
+
+class Node:
+    __slots__ = ("nw", "ne", "sw", "se", "level", "population")
+
+    def __init__(self, nw, ne, sw, se, level, population):
+        """Square quadtree node covering 2**level x 2**level cells.
+
+        Nodes are hash-consed by HashLife.join, so two nodes with the same
+        contents are always the same object and can be compared with ``is``.
+
+        Args:
+            nw, ne, sw, se (Node): Quadrants, or None for a single cell
+            level (int): log2 of the node's side length
+            population (int): Number of live cells inside the node
+        """
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.population = population
+
+
+# The two single-cell leaves shared by every universe
+DEAD = Node(None, None, None, None, 0, 0)
+ALIVE = Node(None, None, None, None, 0, 1)
+
+
+class HashLife:
+    def __init__(self, max_nodes=2_000_000, rule=CONWAY):
+        """Initialize an empty, unbounded Hashlife universe.
+
+        The universe is a quadtree whose root is centred on the origin, so
+        cell (row, col) of a loaded Stage grid keeps the same coordinates.
+        Unlike Stage the plane does not wrap around at the edges.
+
+        Args:
+            max_nodes (int): Node count above which unreachable nodes and
+                cached results are garbage-collected after a step
+            rule (str): Rule string such as "B3/S23", or a compiled Rule.
+                Rules with B0 are not supported on an unbounded plane.
+        """
+        self.max_nodes = max_nodes
+        self.nodes = {}  # (nw, ne, sw, se) -> canonical Node
+        self.results = {}  # (node, step_log) -> centre advanced 2**step_log
+        self.rule = rule
+        self.empty_nodes = [DEAD]  # Empty node of each level
+        self.generation = 0
+        self.root = self.empty(3)
+
+    @property
+    def population(self):
+        return self.root.population
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @rule.setter
+    def rule(self, rule):
+        rule = compile_rule(rule)
+        if 0 in rule.birth:
+            raise ValueError(f"{rule} would fill the infinite empty plane")
+        # Memoized results only hold for the rule they were computed under
+        self._rule = rule
+        self.results = {}
+
+    def join(self, nw, ne, sw, se):
+        """Return the canonical node made of four equal-level quadrants."""
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw, ne, sw, se, nw.level + 1, population)
+            self.nodes[key] = node
+        return node
+
+    def empty(self, level):
+        """Return the canonical empty node of the given level."""
+        while len(self.empty_nodes) <= level:
+            child = self.empty_nodes[-1]
+            self.empty_nodes.append(self.join(child, child, child, child))
+        return self.empty_nodes[level]
+
+    def centre(self, node):
+        """Return the level - 1 node at the centre of a node."""
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def expand(self, node):
+        """Surround a node with empty space, keeping it centred."""
+        border = self.empty(node.level - 1)
+        return self.join(
+            self.join(border, border, border, node.nw),
+            self.join(border, border, node.ne, border),
+            self.join(border, node.sw, border, border),
+            self.join(node.se, border, border, border),
+        )
+
+    def step_base(self, node):
+        """Advance the centre 2x2 of a 4x4 node by one generation."""
+        cells = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        rule_table = self.rule.table
+        next_cells = []
+        for row in (1, 2):
+            for col in (1, 2):
+                living_neighbors = sum(
+                    cells[row + d_row][col + d_col].population
+                    for d_row in (-1, 0, 1)
+                    for d_col in (-1, 0, 1)
+                    if d_row or d_col
+                )
+                alive = rule_table[cells[row][col].population][living_neighbors]
+                next_cells.append(ALIVE if alive else DEAD)
+        return self.join(*next_cells)
+
+    def step(self, node, step_log):
+        """Advance the centre of a node by 2**step_log generations.
+
+        Args:
+            node (Node): Node of level >= 2
+            step_log (int): log2 of the generations to run, at most level - 2
+
+        Returns:
+            Node: The level - 1 centre of the node after the jump
+        """
+        if node.population == 0:
+            return self.empty(node.level - 1)
+        key = (node, step_log)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            result = self.step_base(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # The nine overlapping level - 1 sub-squares
+            parts = [
+                nw,
+                self.join(nw.ne, ne.nw, nw.se, ne.sw),
+                ne,
+                self.join(nw.sw, nw.se, sw.nw, sw.ne),
+                self.join(nw.se, ne.sw, sw.ne, se.nw),
+                self.join(ne.sw, ne.se, se.nw, se.ne),
+                sw,
+                self.join(sw.ne, se.nw, sw.se, se.sw),
+                se,
+            ]
+            if step_log == node.level - 2:
+                # Full speed: spend half the jump on each of two passes
+                parts = [self.step(part, step_log - 1) for part in parts]
+                second_log = step_log - 1
+            else:
+                # Slower jump: first pass only recentres, second pass steps
+                parts = [self.centre(part) for part in parts]
+                second_log = step_log
+            quadrants = (
+                self.join(parts[0], parts[1], parts[3], parts[4]),
+                self.join(parts[1], parts[2], parts[4], parts[5]),
+                self.join(parts[3], parts[4], parts[6], parts[7]),
+                self.join(parts[4], parts[5], parts[7], parts[8]),
+            )
+            result = self.join(
+                *(self.step(quadrant, second_log) for quadrant in quadrants)
+            )
+
+        self.results[key] = result
+        return result
+
+    def is_padded(self, node):
+        """Check that all live cells lie in the centre quarter of a node."""
+        return (
+            node.nw.nw.population
+            + node.nw.ne.population
+            + node.nw.sw.population
+            + node.ne.nw.population
+            + node.ne.ne.population
+            + node.ne.se.population
+            + node.sw.nw.population
+            + node.sw.sw.population
+            + node.sw.se.population
+            + node.se.ne.population
+            + node.se.sw.population
+            + node.se.se.population
+        ) == 0
+
+    def advance(self, step_log):
+        """Advance the whole universe by 2**step_log generations.
+
+        Args:
+            step_log (int): log2 of the number of generations to run
+        """
+        root = self.root
+        while root.level < step_log + 2 or not self.is_padded(root):
+            root = self.expand(root)
+        # One more ring of space so nothing escapes during the jump
+        self.root = self.step(self.expand(root), step_log)
+        self.generation += 1 << step_log
+
+        if len(self.nodes) > self.max_nodes:
+            self.collect()
+
+    def run(self, generations):
+        """Advance the universe by any number of generations.
+
+        The count is split into power-of-two jumps, so generation 10**6 of
+        a regular pattern takes about 20 cached jumps.
+
+        Args:
+            generations (int): Number of generations to run
+        """
+        step_log = 0
+        while generations:
+            if generations & 1:
+                self.advance(step_log)
+            generations >>= 1
+            step_log += 1
+
+    def collect(self):
+        """Drop nodes and cached results that the root no longer reaches."""
+        reachable = set(map(id, self.empty_nodes))
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node.level == 0 or id(node) in reachable:
+                continue
+            reachable.add(id(node))
+            pending.extend((node.nw, node.ne, node.sw, node.se))
+
+        self.nodes = {
+            key: node for key, node in self.nodes.items() if id(node) in reachable
+        }
+        self.results = {
+            key: result
+            for key, result in self.results.items()
+            if id(key[0]) in reachable and id(result) in reachable
+        }
+
+    def build(self, level, top, left, cells):
+        """Build a node from live (row, col) cells inside its square."""
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return ALIVE
+        half = 1 << (level - 1)
+        quadrants = ([], [], [], [])
+        for row, col in cells:
+            quadrants[(row >= top + half) * 2 + (col >= left + half)].append((row, col))
+        return self.join(
+            self.build(level - 1, top, left, quadrants[0]),
+            self.build(level - 1, top, left + half, quadrants[1]),
+            self.build(level - 1, top + half, left, quadrants[2]),
+            self.build(level - 1, top + half, left + half, quadrants[3]),
+        )
+
+    def set_cells(self, cells):
+        """Replace the universe with the given live cells.
+
+        Args:
+            cells (iterable): (row, col) coordinates of live cells
+        """
+        cells = list(cells)
+        extent = max((max(abs(row), abs(col)) for row, col in cells), default=0)
+        level = 3
+        while (1 << (level - 1)) <= extent:
+            level += 1
+        half = 1 << (level - 1)
+        self.root = self.build(level, -half, -half, cells)
+
+    def get_cells(self, top=None, left=None, height=None, width=None):
+        """List the live cells, optionally only those inside a window.
+
+        Returns:
+            list: (row, col) tuples of live cells
+        """
+        half = 1 << (self.root.level - 1)
+        bottom = None if height is None else top + height
+        right = None if width is None else left + width
+        cells = []
+        pending = [(self.root, -half, -half)]
+        while pending:
+            node, node_top, node_left = pending.pop()
+            size = 1 << node.level
+            if node.population == 0:
+                continue
+            if top is not None and (
+                node_top >= bottom
+                or node_left >= right
+                or node_top + size <= top
+                or node_left + size <= left
+            ):
+                continue
+            if node.level == 0:
+                cells.append((node_top, node_left))
+                continue
+            half_size = size >> 1
+            pending.append((node.nw, node_top, node_left))
+            pending.append((node.ne, node_top, node_left + half_size))
+            pending.append((node.sw, node_top + half_size, node_left))
+            pending.append((node.se, node_top + half_size, node_left + half_size))
+        return cells
+
+    def set_grid(self, grid):
+        """Load a Stage-style grid, placing cell [row][col] at (row, col).
+
+        Args:
+            grid: 2D list or array of cell states, such as Stage.current_grid
+        """
+        self.set_cells(
+            (row, col)
+            for row, cells in enumerate(grid)
+            for col, alive in enumerate(cells)
+            if alive
+        )
+
+    def get_grid(self, height, width, top=0, left=0):
+        """Export a window of the universe as a Stage-style grid.
+
+        Args:
+            height (int): Number of rows to export
+            width (int): Number of columns to export
+            top (int): Universe row shown in grid row 0
+            left (int): Universe column shown in grid column 0
+
+        Returns:
+            list: 2D list of booleans that can be assigned to
+                 Stage.current_grid
+        """
+        grid = [[False for col in range(width)] for row in range(height)]
+        for row, col in self.get_cells(top, left, height, width):
+            grid[row - top][col - left] = True
+        return grid
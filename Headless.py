@@ -0,0 +1,130 @@
+import argparse
+import time
+
+import numpy as np
+
+from BoardFile import BoardFile, save_board
+from CycleDetector import CycleDetector
+from Patterns import load_pattern, save_pattern
+from Rule import CONWAY
+from Stage import BACKENDS, create_stage
+
+
+def parse_size(text):
+    """Parse a board size such as "512" or "256x1024" into (height, width)."""
+    height, _, width = text.lower().partition("x")
+    return int(height), int(width or height)
+
+
+def build_stage(args):
+    """Create the stage described by the command line arguments."""
+    if args.pattern and args.pattern.endswith(".brd"):
+        # A BitStage steps straight from the file's memory map
+        stage = BoardFile(args.pattern).to_stage(args.backend)
+        if args.rule:
+            stage.rule = args.rule
+        return stage
+
+    height, width = args.size
+    stage = create_stage(height, width, args.backend, rule=args.rule or CONWAY)
+    if args.pattern:
+        reader = load_pattern(stage, args.pattern, args.top, args.left)
+        if not args.rule and reader.rule:
+            # Use the rule stored in the pattern file
+            stage.rule = reader.rule
+    else:
+        # Random soup centred on the board
+        soup_height, soup_width = args.soup_size or args.size
+        soup = np.zeros((height, width), dtype=bool)
+        rng = np.random.default_rng(args.seed)
+        top, left = (height - soup_height) // 2, (width - soup_width) // 2
+        soup[top : top + soup_height, left : left + soup_width] = (
+            rng.random((soup_height, soup_width)) < args.density
+        )
+        stage.from_array(soup)
+    return stage
+
+
+def run(stage, generations, report_interval=1.0, stop_when_settled=False):
+    """Step a stage as fast as possible, printing progress now and then.
+
+    Args:
+        stage (Stage): Stage to step
+        generations (int): Generations to run
+        report_interval (float): Seconds between progress lines, 0 for none
+        stop_when_settled (bool): Stop early once the board is dead or a
+                                  still life
+
+    Returns:
+        tuple: (generations run, seconds taken)
+    """
+    cycle_detector = CycleDetector(stage) if stop_when_settled else None
+    start = last_report = time.perf_counter()
+    generation = 0
+    while generation < generations:
+        if cycle_detector:
+            cycle_detector.step()
+        else:
+            stage.generate_next_grid()
+        generation += 1
+        if cycle_detector and cycle_detector.settled:
+            print(f"Settled at generation {generation:,}")
+            break
+
+        now = time.perf_counter()
+        if report_interval and now - last_report >= report_interval:
+            rate = generation / (now - start)
+            print(f"generation {generation:,}: {rate:,.1f} gen/s")
+            last_report = now
+    return generation, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a simulation without opening a window"
+    )
+    parser.add_argument(
+        "--pattern", help="RLE, plaintext, Life 1.06 or .brd board file to load"
+    )
+    parser.add_argument("--size", type=parse_size, default=(512, 512))
+    parser.add_argument("--top", type=int, default=0, help="row to place pattern")
+    parser.add_argument("--left", type=int, default=0, help="column to place pattern")
+    parser.add_argument("--soup-size", type=parse_size, default=None)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="numpy")
+    parser.add_argument(
+        "--rule", default=None, help="rule string, default the file's or B3/S23"
+    )
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument("--report-interval", type=float, default=1.0)
+    parser.add_argument("--stop-when-settled", action="store_true")
+    parser.add_argument(
+        "--output", help="snapshot to write at the end (.rle, .cells, .lif or .brd)"
+    )
+    args = parser.parse_args()
+
+    stage = build_stage(args)
+    try:
+        generations, elapsed = run(
+            stage, args.generations, args.report_interval, args.stop_when_settled
+        )
+        cells = stage.height * stage.width
+        rate = generations / elapsed if elapsed else float("inf")
+        print(
+            f"{generations:,} generations of {stage.height}x{stage.width} "
+            f"with {args.backend} in {elapsed:.2f}s: {rate:,.1f} gen/s, "
+            f"{rate * cells:,.0f} cells/s"
+        )
+        print(f"Population: {len(stage.live_coordinates()[0]):,}")
+
+        if args.output:
+            if args.output.endswith(".brd"):
+                save_board(stage, args.output, generations)
+            else:
+                save_pattern(stage, args.output)
+            print(f"Snapshot written to {args.output}")
+    finally:
+        close = getattr(stage, "close", None)
+        if close:
+            close()
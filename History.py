@@ -0,0 +1,274 @@
+from bisect import bisect_right
+
+import numpy as np
+
+# Kinds of history entries
+EDIT = "edit"
+STEP = "step"
+
+# Rough bytes of bookkeeping per entry on top of its cell arrays
+ENTRY_OVERHEAD = 200
+
+
+class History:
+    def __init__(
+        self,
+        stage,
+        keyframe_interval=256,
+        keyframe_changes=None,
+        memory_budget=64 << 20,
+    ):
+        """Undo/redo history of edits and generations stored as deltas.
+
+        Each entry holds only the cells it flipped, so undoing or redoing
+        it costs time proportional to the cells that changed. The whole
+        board is stored as a bit-packed keyframe once keyframe_changes
+        cells have flipped since the last one, or after keyframe_interval
+        entries, so keyframes are dense while the board is busy and sparse
+        once it settles. Seeking, to a position or to a generation, replays
+        deltas from the nearest keyframe.
+        When the history grows past memory_budget bytes, the oldest entries
+        up to the next keyframe are dropped, so the oldest remaining
+        position can always be rebuilt.
+
+        Args:
+            stage (Stage): Bounded stage whose changes are recorded; its
+                change tracking is switched on
+            keyframe_interval (int): Most entries between keyframes
+            keyframe_changes (int): Flipped cells that trigger a keyframe,
+                defaults to a quarter of the board
+            memory_budget (int): Most bytes the deltas and keyframes may use
+        """
+        if not stage.wrap:
+            raise ValueError("History needs a bounded stage, not an unbounded plane")
+        self.stage = stage
+        # Smallest integer type that holds any row or column
+        self.index_type = np.min_scalar_type(max(stage.height, stage.width) - 1)
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_changes = keyframe_changes or stage.height * stage.width // 4
+        self.memory_budget = memory_budget
+        stage.track_changes = True
+        self.clear()
+
+    def clear(self, generation=0):
+        """Forget all entries and start again from the current board.
+
+        Args:
+            generation (int): Generation number of the board as it stands
+        """
+        self.entries = []  # (kind, rows, cols) of each entry, oldest first
+        self.entry_generations = []  # Generation each entry leads to
+        self.first = 0  # Position of the oldest entry still kept
+        self.position = 0  # Entries applied up to the current board
+        self.generation = generation  # Generation of the current board
+        # Position -> (bit-packed board, generation) at that position
+        self.keyframes = {}
+        self.keyframe_positions = []  # Sorted keys of keyframes
+        self.changes_since_keyframe = 0  # Cells flipped since the last one
+        self.memory_used = 0
+        self.store_keyframe()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def end(self):
+        """Position after the newest entry."""
+        return self.first + len(self.entries)
+
+    @property
+    def first_generation(self):
+        """Generation at the oldest position, which always has a keyframe."""
+        return self.keyframes[self.first][1]
+
+    @property
+    def end_generation(self):
+        """Generation at the position after the newest entry."""
+        if not self.entry_generations:
+            return self.first_generation
+        return self.entry_generations[-1]
+
+    @property
+    def can_undo(self):
+        return self.position > self.first
+
+    @property
+    def can_redo(self):
+        return self.position < self.end
+
+    def store_keyframe(self):
+        """Store the current board as the keyframe of the current position."""
+        board = np.packbits(self.stage.to_array())
+        self.keyframes[self.position] = (board, self.generation)
+        self.keyframe_positions.append(self.position)
+        self.changes_since_keyframe = 0
+        self.memory_used += board.nbytes
+
+    def drop_keyframe(self, position):
+        """Forget the keyframe stored for a position."""
+        board, generation = self.keyframes.pop(position)
+        self.keyframe_positions.remove(position)
+        self.memory_used -= board.nbytes
+
+    def restore_keyframe(self, position):
+        """Replace the board with the keyframe stored for a position."""
+        board, self.generation = self.keyframes[position]
+        height, width = self.stage.height, self.stage.width
+        board = np.unpackbits(board, count=height * width).view(bool)
+        self.stage.from_array(board.reshape(height, width))
+        self.position = position
+
+    def record(self, kind, rows, cols):
+        """Add an entry for cells that were just flipped.
+
+        Entries that could still have been redone are discarded first.
+
+        Args:
+            kind (str): EDIT or STEP
+            rows (sequence): Row of each flipped cell
+            cols (sequence): Column of each flipped cell
+        """
+        self.truncate()
+        rows = np.asarray(rows, dtype=self.index_type)
+        cols = np.asarray(cols, dtype=self.index_type)
+        self.entries.append((kind, rows, cols))
+        self.memory_used += rows.nbytes + cols.nbytes + ENTRY_OVERHEAD
+        self.position += 1
+        self.generation += kind == STEP
+        self.entry_generations.append(self.generation)
+
+        self.changes_since_keyframe += len(rows)
+        since_keyframe = self.position - self.keyframe_positions[-1]
+        if (
+            self.changes_since_keyframe >= self.keyframe_changes
+            or since_keyframe >= self.keyframe_interval
+        ):
+            self.store_keyframe()
+        self.evict()
+
+    def record_edit(self, row, col):
+        """Add an entry for one cell the user toggled."""
+        self.record(EDIT, (row,), (col,))
+
+    def record_step(self):
+        """Add an entry for the generation the stage has just stepped to."""
+        self.record(STEP, *self.stage.changed_cells)
+
+    def truncate(self):
+        """Drop the entries after the current position."""
+        if self.position == self.end:
+            return
+        for kind, rows, cols in self.entries[self.position - self.first :]:
+            self.memory_used -= rows.nbytes + cols.nbytes + ENTRY_OVERHEAD
+        del self.entries[self.position - self.first :]
+        del self.entry_generations[self.position - self.first :]
+        for position in self.keyframe_positions[
+            bisect_right(self.keyframe_positions, self.position) :
+        ]:
+            self.drop_keyframe(position)
+
+        last_keyframe = self.keyframe_positions[-1] - self.first
+        self.changes_since_keyframe = sum(
+            len(rows) for kind, rows, cols in self.entries[last_keyframe:]
+        )
+
+    def evict(self):
+        """Drop the oldest keyframe's entries while over the memory budget."""
+        while self.memory_used > self.memory_budget:
+            if len(self.keyframe_positions) < 2:
+                return
+            drop_to = self.keyframe_positions[1]
+            if drop_to > self.position:
+                return
+            for kind, rows, cols in self.entries[: drop_to - self.first]:
+                self.memory_used -= rows.nbytes + cols.nbytes + ENTRY_OVERHEAD
+            del self.entries[: drop_to - self.first]
+            del self.entry_generations[: drop_to - self.first]
+            self.drop_keyframe(self.first)
+            self.first = drop_to
+
+    def undo(self):
+        """Flip back the cells of the entry before the current position.
+
+        Returns:
+            tuple: (kind, births, deaths) of the undo, or None at the start
+        """
+        if not self.can_undo:
+            return None
+        self.position -= 1
+        kind, rows, cols = self.entries[self.position - self.first]
+        self.generation -= kind == STEP
+        births = self.stage.flip(rows, cols)
+        return kind, births, len(rows) - births
+
+    def redo(self):
+        """Flip again the cells of the entry after the current position.
+
+        Returns:
+            tuple: (kind, births, deaths) of the redo, or None at the end
+        """
+        if not self.can_redo:
+            return None
+        kind, rows, cols = self.entries[self.position - self.first]
+        self.position += 1
+        self.generation += kind == STEP
+        births = self.stage.flip(rows, cols)
+        return kind, births, len(rows) - births
+
+    def seek(self, position):
+        """Bring the board to any recorded position.
+
+        Deltas are replayed forwards or backwards from whichever of the
+        current board, the nearest keyframe before the position and the
+        nearest keyframe after it needs the fewest, so a seek replays at
+        most one keyframe spacing of entries.
+
+        Args:
+            position (int): Position to reach, clamped to the recorded range
+
+        Returns:
+            int: Number of entries replayed
+        """
+        position = min(max(position, self.first), self.end)
+        keyframes = self.keyframe_positions
+        # (entries to replay, keyframe to restore first or None)
+        candidates = [(abs(position - self.position), None)]
+        before = bisect_right(keyframes, position) - 1
+        candidates.append((position - keyframes[before] + 1, keyframes[before]))
+        if before + 1 < len(keyframes):
+            after = keyframes[before + 1]
+            candidates.append((after - position + 1, after))
+        cost, keyframe = min(candidates, key=lambda candidate: candidate[0])
+
+        if keyframe is not None:
+            self.restore_keyframe(keyframe)
+        replayed = abs(position - self.position)
+        while self.position < position:
+            self.redo()
+        while self.position > position:
+            self.undo()
+        return replayed
+
+    def position_of(self, generation):
+        """Find the recorded position showing a generation.
+
+        Edits share the generation they were made in, so the position
+        after the last of them is used: the board as it was stepped on.
+
+        Args:
+            generation (int): Generation to find, clamped to the recorded
+                range
+
+        Returns:
+            int: Position for seek()
+        """
+        generation = min(max(generation, self.first_generation), self.end_generation)
+        return self.first + bisect_right(self.entry_generations, generation)
+
+    def seek_generation(self, generation):
+        """Bring the board to any recorded generation, as seek() does.
+
+        Returns:
+            int: Number of entries replayed
+        """
+        return self.seek(self.position_of(generation))
@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import zipfile
+
+from Objects import canonical_form, form_code
+from Patterns import load_pattern
+from SparseStage import SparseStage
+
+# Extensions of the pattern files picked up by a bulk import
+PATTERN_EXTENSIONS = (".rle", ".cells", ".lif", ".life")
+
+
+def canonical_key(rows, cols):
+    """Hash live cells so every translation, rotation and reflection agrees.
+
+    The hash is taken of the cells' object code, so a library key and a
+    census code always come from the same canonical form.
+
+    Args:
+        rows (sequence): Row of each live cell
+        cols (sequence): Column of each live cell, same length as rows
+
+    Returns:
+        str: 32 hex digits, or None when there are no live cells
+    """
+    if not len(rows):
+        return None
+    code = form_code(canonical_form(rows, cols))
+    return hashlib.blake2b(code.encode("ascii"), digest_size=16).hexdigest()
+
+
+def read_pattern_cells(file):
+    """Read a pattern file into the rows and columns of its live cells."""
+    stage = SparseStage(0, 0, wrap=False)
+    reader = load_pattern(stage, file)
+    rows = [row for row, col in stage.live_cells]
+    cols = [col for row, col in stage.live_cells]
+    return reader, rows, cols
+
+
+def pattern_name(reader, source):
+    """Take a pattern's name from its "#N" comment, or else its file name."""
+    for comment in reader.comments:
+        if comment.startswith("N "):
+            return comment[2:].strip()
+    return os.path.splitext(os.path.basename(source))[0]
+
+
+def index_pattern(task):
+    """Worker task: read one pattern file and work out its library entry.
+
+    Args:
+        task (tuple): (path, member), member naming a file inside the zip
+                      archive at path, or None for a plain file
+
+    Returns:
+        tuple: (key, entry dict), key None if unreadable or empty
+    """
+    path, member = task
+    source = f"{path}:{member}" if member else path
+    try:
+        if member:
+            with zipfile.ZipFile(path) as archive, archive.open(member) as file:
+                reader, rows, cols = read_pattern_cells(file)
+        else:
+            with open(path, "rb") as file:
+                reader, rows, cols = read_pattern_cells(file)
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None, {"source": source}
+
+    key = canonical_key(rows, cols)
+    entry = {
+        "name": pattern_name(reader, member or path),
+        "source": source,
+        "population": len(rows),
+        "rule": reader.rule,
+    }
+    return key, entry
+
+
+def find_pattern_files(paths):
+    """List the pattern files in folders, zip archives and single files.
+
+    Returns:
+        list: (path, member) tasks for index_pattern
+    """
+    tasks = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, folders, files in os.walk(path):
+                for name in sorted(files):
+                    full_path = os.path.join(folder, name)
+                    if name.lower().endswith(PATTERN_EXTENSIONS):
+                        tasks.append((full_path, None))
+                    elif name.lower().endswith(".zip"):
+                        tasks.extend(find_pattern_files([full_path]))
+        elif path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                tasks.extend(
+                    (path, member)
+                    for member in archive.namelist()
+                    if member.lower().endswith(PATTERN_EXTENSIONS)
+                )
+        else:
+            tasks.append((path, None))
+    return tasks
+
+
+class PatternLibrary:
+    def __init__(self, path):
+        """Pattern library indexed by canonical key, resumed from path.
+
+        Args:
+            path (str): JSON file the index is kept in
+        """
+        self.path = path
+        self.patterns = {}  # Canonical key -> entry dict
+
+        if os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __contains__(self, key):
+        return key in self.patterns
+
+    def load(self):
+        """Read the index at self.path."""
+        with open(self.path) as file:
+            self.patterns = json.load(file)["patterns"]
+
+    def save(self):
+        """Write the index, replacing the old file atomically."""
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump({"patterns": self.patterns}, file, indent=1)
+        os.replace(temporary, self.path)
+
+    def find(self, rows, cols):
+        """Look up live cells in any position, rotation or reflection.
+
+        Args:
+            rows (sequence): Row of each live cell
+            cols (sequence): Column of each live cell
+
+        Returns:
+            dict: The library entry, or None if the pattern is not in it
+        """
+        return self.patterns.get(canonical_key(rows, cols))
+
+    def add(self, rows, cols, name, source=None, rule=None):
+        """Add live cells as a pattern unless an equivalent one is stored.
+
+        Returns:
+            bool: True if the pattern was new
+        """
+        key = canonical_key(rows, cols)
+        if key is None or key in self.patterns:
+            return False
+        self.patterns[key] = {
+            "name": name,
+            "source": source,
+            "population": len(rows),
+            "rule": rule,
+        }
+        return True
+
+    def import_files(self, paths, workers=None, report=print):
+        """Index every pattern file in folders, zip archives or single files.
+
+        Files are read and hashed on a process pool; patterns already in
+        the library are skipped. The index is saved at the end.
+
+        Args:
+            paths (iterable): Folders, zip archives and pattern files
+            workers (int): Worker processes, defaults to the number of CPUs
+            report (callable): Receives a summary line when done
+
+        Returns:
+            tuple: (added, duplicates, unreadable) counts
+        """
+        tasks = find_pattern_files(paths)
+        added = duplicates = unreadable = 0
+        with multiprocessing.Pool(workers) as pool:
+            for key, entry in pool.imap(index_pattern, tasks, chunksize=16):
+                if key is None:
+                    unreadable += 1
+                elif key in self.patterns:
+                    duplicates += 1
+                else:
+                    self.patterns[key] = entry
+                    added += 1
+        self.save()
+        report(
+            f"{len(tasks):,} files: {added:,} added, {duplicates:,} already in "
+            f"the library, {unreadable:,} unreadable or empty"
+        )
+        return added, duplicates, unreadable
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import patterns")
+    parser.add_argument("library", help="library index JSON, resumed if it exists")
+    parser.add_argument("paths", nargs="+", help="folders, zip archives or files")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    library = PatternLibrary(args.library)
+    library.import_files(args.paths, args.workers)
+    print(f"{len(library):,} patterns in {args.library}")
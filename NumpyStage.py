@@ -0,0 +1,137 @@
+import numpy as np
+
+from Rule import CONWAY
+from Stage import Stage
+
+
+def block_totals(cells):
+    """Count the live cells in every 3x3 block, with wraparound.
+
+    The count includes the centre cell itself. It is computed with
+    whole-array shifted adds over the last two axes, first along each row
+    and then down each column, so a stack of boards is counted at once.
+
+    Args:
+        cells (numpy.ndarray): Bool array of shape (..., height, width)
+
+    Returns:
+        numpy.ndarray: uint8 array of block totals with the same shape
+    """
+    cells = cells.view(np.uint8)
+    rows = cells + np.roll(cells, 1, axis=-1) + np.roll(cells, -1, axis=-1)
+    return rows + np.roll(rows, 1, axis=-2) + np.roll(rows, -1, axis=-2)
+
+
+def apply_rule(rule, cells, totals):
+    """Compute next states from cell states and 3x3 block totals.
+
+    Builds one boolean mask per block total that can give life under the
+    rule, which for B3/S23 is just totals 3 and 4.
+
+    Args:
+        rule (Rule): Compiled rule to apply
+        cells (numpy.ndarray): Bool array of current cell states
+        totals (numpy.ndarray): Live cells in each 3x3 block, centre included
+
+    Returns:
+        numpy.ndarray: Bool array of next cell states
+    """
+    next_cells = np.zeros(cells.shape, dtype=bool)
+    for total, born, survives in rule.live_totals:
+        matches = totals == total
+        if not born:
+            matches &= cells
+        elif not survives:
+            matches &= ~cells
+        next_cells |= matches
+    return next_cells
+
+
+def compare_generations(cells, next_cells):
+    """Find the cells that changed between two generations.
+
+    Args:
+        cells (numpy.ndarray): Bool array of the earlier generation
+        next_cells (numpy.ndarray): Bool array of the later generation
+
+    Returns:
+        tuple: (changed_cells, births, deaths), where changed_cells is the
+               (rows, cols) index arrays of every flipped cell
+    """
+    changed_cells = np.nonzero(cells != next_cells)
+    births = int(np.count_nonzero(next_cells[changed_cells]))
+    return changed_cells, births, len(changed_cells[0]) - births
+
+
+class NumpyStage(Stage):
+    def __init__(self, height, width, rule=CONWAY):
+        """Initialize a NumPy-backed game stage.
+
+        Drop-in replacement for Stage: the grid is a 2D bool array, so
+        existing code that reads or toggles ``current_grid[row][col]``
+        keeps working unchanged.
+
+        Args:
+            height (int): Number of rows in the grid
+            width (int): Number of columns in the grid
+            rule (str): Rule string such as "B3/S23", or a compiled Rule
+        """
+        self.height = height  # Number of rows
+        self.width = width  # Number of columns
+        self.rule = rule
+        self.current_grid = self.blank_grid()
+
+    @property
+    def current_grid(self):
+        return self._grid
+
+    @current_grid.setter
+    def current_grid(self, grid):
+        # Accept plain lists of lists too, so callers can assign a Stage grid
+        self._grid = np.ascontiguousarray(grid, dtype=bool)
+
+    def blank_grid(self):
+        """Create an empty grid with the correct dimensions.
+
+        Returns:
+            numpy.ndarray: (height, width) bool array of dead cells
+        """
+        return np.zeros((self.height, self.width), dtype=bool)
+
+    def count_neighbors(self):
+        """Count the live cells in every 3x3 block, with wraparound.
+
+        Returns:
+            numpy.ndarray: (height, width) uint8 array of block totals,
+                 each including the centre cell itself
+        """
+        return block_totals(self.current_grid)
+
+    def replace_grid(self, next_grid):
+        """Make next_grid current, noting which cells flipped if tracking."""
+        if self.track_changes:
+            changes = compare_generations(self.current_grid, next_grid)
+            self.changed_cells, self.births, self.deaths = changes
+        self.current_grid = next_grid
+
+    def generate_next_grid(self):
+        """Apply the stage's rule to generate the next generation."""
+        totals = self.count_neighbors()
+        self.replace_grid(apply_rule(self.rule, self.current_grid, totals))
+
+    def read_region(self, top, left, height, width):
+        return self.current_grid[top : top + height, left : left + width].copy()
+
+    def from_array(self, board):
+        self.current_grid = board
+
+    def live_coordinates(self):
+        return np.nonzero(self.current_grid)
+
+    def set_cells(self, rows, cols):
+        self.current_grid[rows, cols] = True
+
+    def flip(self, rows, cols):
+        grid = self.current_grid
+        grid[rows, cols] ^= True
+        return int(np.count_nonzero(grid[rows, cols]))
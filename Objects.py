@@ -0,0 +1,422 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Rule import CONWAY, compile_rule
+from SparseStage import NEIGHBOR_OFFSETS, SparseStage
+
+# Offsets to the neighbors after a cell in reading order; with the cell
+# before it along each, every 8-neighbor pair is covered once
+FORWARD_OFFSETS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+# Classification results keyed by (rule, normalized cells), holding at
+# most CLASSIFY_CACHE_SIZE objects; the oldest is dropped beyond that
+CLASSIFY_CACHE_SIZE = 1 << 16
+_classify_cache = {}
+
+# The 8 rotations and reflections of the plane, as (row, col) maps
+SYMMETRIES = (
+    lambda row, col: (row, col),
+    lambda row, col: (col, -row),
+    lambda row, col: (-row, -col),
+    lambda row, col: (-col, row),
+    lambda row, col: (row, -col),
+    lambda row, col: (-row, col),
+    lambda row, col: (col, row),
+    lambda row, col: (-col, -row),
+)
+
+# Small objects common in soup ash, drawn in one phase and orientation
+OBJECT_PICTURES = {
+    "block": ["OO", "OO"],
+    "blinker": ["OOO"],
+    "beehive": [".OO.", "O..O", ".OO."],
+    "loaf": [".OO.", "O..O", ".O.O", "..O."],
+    "boat": ["OO.", "O.O", ".O."],
+    "ship": ["OO.", "O.O", ".OO"],
+    "tub": [".O.", "O.O", ".O."],
+    "pond": [".OO.", "O..O", "O..O", ".OO."],
+    "toad": [".OOO", "OOO."],
+    "beacon": ["OO..", "OO..", "..OO", "..OO"],
+    "glider": [".O.", "..O", "OOO"],
+    "long boat": ["OO..", "O.O.", ".O.O", "..O."],
+    "barge": [".O..", "O.O.", ".O.O", "..O."],
+    "mango": [".OO..", "O..O.", ".O..O", "..OO."],
+    "eater": ["OO..", "O.O.", "..O.", "..OO"],
+    "pulsar": [
+        "..OOO...OOO..",
+        ".............",
+        "O....O.O....O",
+        "O....O.O....O",
+        "O....O.O....O",
+        "..OOO...OOO..",
+        ".............",
+        "..OOO...OOO..",
+        "O....O.O....O",
+        "O....O.O....O",
+        "O....O.O....O",
+        ".............",
+        "..OOO...OOO..",
+    ],
+}
+
+
+def picture_cells(picture):
+    """Convert rows of "O" (alive) and "." (dead) into live cells.
+
+    Returns:
+        set: (row, col) tuples of live cells
+    """
+    return {
+        (row, col)
+        for row, line in enumerate(picture)
+        for col, char in enumerate(line)
+        if char == "O"
+    }
+
+
+def normalize(cells):
+    """Translate cells so their bounding box starts at (0, 0).
+
+    Returns:
+        tuple: Sorted (row, col) tuples
+    """
+    top = min(row for row, col in cells)
+    left = min(col for row, col in cells)
+    return tuple(sorted((row - top, col - left) for row, col in cells))
+
+
+def oriented_form(rows, cols):
+    """Find the canonical form of live cells and the symmetry that produces it.
+
+    Each of the 8 rotations and reflections is cropped to its bounding
+    box and packed into bits, and the smallest (height, width, bits) is
+    the form, so every position and orientation of a pattern gives the
+    same one. The maps are applied to whole arrays of cells at once.
+
+    Args:
+        rows (sequence): Row of each live cell
+        cols (sequence): Column of each live cell, same length as rows
+
+    Returns:
+        tuple: (form, index into SYMMETRIES of the map from cells to form)
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    smallest = None
+    for index, symmetry in enumerate(SYMMETRIES):
+        mapped_rows, mapped_cols = symmetry(rows, cols)
+        mapped_rows = mapped_rows - mapped_rows.min()
+        mapped_cols = mapped_cols - mapped_cols.min()
+        board = np.zeros((mapped_rows.max() + 1, mapped_cols.max() + 1), dtype=bool)
+        board[mapped_rows, mapped_cols] = True
+        form = (*board.shape, np.packbits(board).tobytes())
+        if smallest is None or form < smallest[0]:
+            smallest = (form, index)
+    return smallest
+
+
+def shape_signature(cells):
+    """Population and sorted bounding box sides, equal for all orientations."""
+    rows = [row for row, col in cells]
+    cols = [col for row, col in cells]
+    sides = sorted((max(rows) - min(rows), max(cols) - min(cols)))
+    return len(rows), *sides
+
+
+def canonical_form(rows, cols):
+    """Pick one representative of live cells under translation and symmetry.
+
+    Returns:
+        tuple: (height, width, packed bits) from oriented_form
+    """
+    return oriented_form(rows, cols)[0]
+
+
+def form_code(form):
+    """Encode a canonical form as a short string such as "2x2:3.3".
+
+    The code gives height x width, then each row's cells as a hex bitmask.
+    """
+    height, width, bits = form
+    board = np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=height * width)
+    rows = np.packbits(board.reshape(height, width), axis=1, bitorder="little")
+    return f"{height}x{width}:" + ".".join(
+        f"{int.from_bytes(row.tobytes(), 'little'):x}" for row in rows
+    )
+
+
+def find_components(cells):
+    """Split live cells into groups connected through their 8 neighbors.
+
+    Args:
+        cells (iterable): (row, col) tuples of live cells
+
+    Returns:
+        list: One set of (row, col) tuples per connected group
+    """
+    unvisited = set(cells)
+    components = []
+    while unvisited:
+        pending = [unvisited.pop()]
+        component = set(pending)
+        while pending:
+            row, col = pending.pop()
+            for d_row, d_col in NEIGHBOR_OFFSETS:
+                neighbor = (row + d_row, col + d_col)
+                if neighbor in unvisited:
+                    unvisited.remove(neighbor)
+                    component.add(neighbor)
+                    pending.append(neighbor)
+        components.append(component)
+    return components
+
+
+def classify_object(cells, rule=CONWAY, max_period=30):
+    """Identify an isolated object, its phase and its orientation.
+
+    The object is run on its own until its canonical form repeats. Its
+    code encodes the smallest form seen over those phases, so every phase
+    of an oscillator or spaceship gets the same code. Results are cached
+    by rule and normalized cells, up to CLASSIFY_CACHE_SIZE objects.
+
+    Args:
+        cells (iterable): (row, col) tuples of the object's live cells
+        rule (str): Rule string such as "B3/S23", or a compiled Rule
+        max_period (int): Longest period to follow before giving up
+
+    Returns:
+        tuple: (code, phase, orientation). code comes from form_code and is
+               prefixed with "unstable " when the object did not repeat
+               within max_period generations. phase is how many generations
+               the object is past the phase with the smallest form, or None
+               if unstable. orientation is the index into SYMMETRIES that
+               maps the object, run on to that phase, onto the code's form.
+    """
+    rule = compile_rule(rule)
+    key = (rule, normalize(cells))
+    result = _classify_cache.get(key)
+    if result is not None:
+        return result
+
+    stage = SparseStage(0, 0, wrap=False, rule=rule)
+    stage.live_cells = set(cells)
+    phases = [stage.live_coordinates()]
+    first = oriented_form(*phases[0])
+    first_shape = shape_signature(stage.live_cells)
+    result = ("unstable " + form_code(first[0]), None, first[1])
+    for generation in range(1, max_period + 1):
+        stage.generate_next_grid()
+        if not stage.live_cells:
+            break
+        # Full forms are only compared once the cheap signature matches
+        if (
+            shape_signature(stage.live_cells) == first_shape
+            and oriented_form(*stage.live_coordinates())[0] == first[0]
+        ):
+            forms = [first] + [oriented_form(*phase) for phase in phases[1:]]
+            smallest = min(forms)
+            phase = (generation - forms.index(smallest)) % generation
+            result = (form_code(smallest[0]), phase, smallest[1])
+            break
+        phases.append(stage.live_coordinates())
+
+    if len(_classify_cache) >= CLASSIFY_CACHE_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest
+        del _classify_cache[next(iter(_classify_cache))]
+    _classify_cache[key] = result
+    return result
+
+
+def object_code(cells, rule=CONWAY, max_period=30):
+    """Identify an isolated object regardless of position, phase and symmetry.
+
+    Returns:
+        str: Code from form_code, prefixed with "unstable " when the
+             object did not repeat within max_period generations
+    """
+    return classify_object(cells, rule, max_period)[0]
+
+
+def label_components(board, wrap=True):
+    """Label the groups of live cells connected through their 8 neighbors.
+
+    Neighboring live cells are paired up with array shifts, then the pairs
+    are merged by repeated vectorized hooking of the larger root onto the
+    smaller one and pointer jumping, so there is no per-cell Python loop.
+
+    Args:
+        board (numpy.ndarray): (height, width) bool array of live cells
+        wrap (bool): Connect cells across opposite edges, as Stage does
+
+    Returns:
+        tuple: (labels, count). labels is an int array shaped like board
+               with 0 for dead cells and 1..count for each group.
+    """
+    live = np.flatnonzero(board)
+    index = np.full(board.shape, -1, dtype=np.int64)
+    index.flat[live] = np.arange(len(live))
+
+    # Pairs of neighboring live cells, by their position in live
+    firsts, seconds = [], []
+    for d_row, d_col in FORWARD_OFFSETS:
+        if wrap:
+            neighbor = np.roll(index, (-d_row, -d_col), axis=(0, 1))
+        else:
+            neighbor = np.full(board.shape, -1, dtype=np.int64)
+            rows = slice(0, board.shape[0] - d_row)
+            source_cols = slice(max(d_col, 0), board.shape[1] + min(d_col, 0))
+            target_cols = slice(max(-d_col, 0), board.shape[1] - max(d_col, 0))
+            neighbor[rows, target_cols] = index[d_row:, source_cols]
+        paired = (index >= 0) & (neighbor >= 0)
+        firsts.append(index[paired])
+        seconds.append(neighbor[paired])
+    firsts, seconds = np.concatenate(firsts), np.concatenate(seconds)
+
+    parent = np.arange(len(live))
+    while True:
+        first_roots, second_roots = parent[firsts], parent[seconds]
+        differ = first_roots != second_roots
+        if not differ.any():
+            break
+        low = np.minimum(first_roots, second_roots)[differ]
+        high = np.maximum(first_roots, second_roots)[differ]
+        np.minimum.at(parent, high, low)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    roots, group = np.unique(parent, return_inverse=True)
+    labels = np.zeros(board.shape, dtype=np.int64)
+    labels.flat[live] = group + 1
+    return labels, len(roots)
+
+
+def unwrap(values, size):
+    """Shift coordinates on a wrapped axis so a group is contiguous.
+
+    The largest gap between the occupied coordinates is taken as the
+    outside of the group, and coordinates after it are moved past size.
+    """
+    occupied = np.unique(values)
+    gaps = np.diff(occupied, append=occupied[0] + size)
+    start = occupied[(np.argmax(gaps) + 1) % len(occupied)]
+    return (values - start) % size + start
+
+
+def find_objects(board, rule=CONWAY, wrap=True, max_period=30):
+    """Split a board into objects and classify each one.
+
+    Args:
+        board (numpy.ndarray): (height, width) bool array of live cells
+        rule (str): Rule string such as "B3/S23", or a compiled Rule
+        wrap (bool): Whether the board wraps around its edges
+        max_period (int): Longest period classify_object follows
+
+    Returns:
+        list: (code, phase, orientation, top, left, population) per object
+    """
+    labels, count = label_components(board, wrap)
+    rows, cols = np.nonzero(labels)
+    groups = labels[rows, cols]
+    order = np.argsort(groups, kind="stable")
+    splits = np.flatnonzero(np.diff(groups[order])) + 1
+
+    objects = []
+    for members in np.split(order, splits) if count else ():
+        object_rows, object_cols = rows[members], cols[members]
+        if wrap:
+            object_rows = unwrap(object_rows, board.shape[0])
+            object_cols = unwrap(object_cols, board.shape[1])
+        cells = list(zip(object_rows.tolist(), object_cols.tolist()))
+        code, phase, orientation = classify_object(cells, rule, max_period)
+        top = int(object_rows.min()) % board.shape[0]
+        left = int(object_cols.min()) % board.shape[1]
+        objects.append((code, phase, orientation, top, left, len(cells)))
+    return objects
+
+
+class ObjectTracker:
+    def __init__(self, rule=CONWAY, wrap=True, every=0, max_period=30):
+        """Classify the objects of board snapshots in a background process.
+
+        Boards, such as those of Simulation snapshots, are sent to one
+        worker process, which keeps its own classification cache between
+        them. The caller goes on meanwhile and collects the result with
+        update(); a new board is only sent once the last one is classified.
+
+        Args:
+            rule (str): Rule string such as "B3/S23", or a compiled Rule
+            wrap (bool): Whether the boards wrap around their edges
+            every (int): Generations between boards sent by update(), 0
+                         for boards sent with submit() only
+            max_period (int): Longest period classify_object follows
+        """
+        self.rule = str(rule)
+        self.wrap = wrap
+        self.every = every
+        self.max_period = max_period
+        # The worker is started on the first submit, when the caller may
+        # already run other threads, so it is spawned rather than forked
+        self.executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.pending = None  # Future of the board being classified
+        self.pending_generation = None  # Generation of that board
+        self.objects = []  # Result of the last finished board
+        self.generation = None  # Generation of that board
+
+    def submit(self, board, generation=None):
+        """Send a board for classification if none is pending.
+
+        Args:
+            board (numpy.ndarray): (height, width) bool array, which must
+                                   not change until the result is in
+            generation (int): Generation of the board
+
+        Returns:
+            bool: True if the board was sent
+        """
+        if self.pending is not None:
+            return False
+        self.pending = self.executor.submit(
+            find_objects, board, self.rule, self.wrap, self.max_period
+        )
+        self.pending_generation = generation
+        return True
+
+    def update(self, board, generation):
+        """Collect a finished result, and send board every Nth generation.
+
+        Generations may be skipped between calls, so board is sent once
+        at least every generations have passed since the last one sent.
+
+        Returns:
+            bool: True if new objects were collected
+        """
+        collected = False
+        if self.pending is not None and self.pending.done():
+            self.objects = self.pending.result()
+            self.generation = self.pending_generation
+            self.pending = None
+            collected = True
+        last = self.generation if self.pending is None else self.pending_generation
+        if self.every and (last is None or abs(generation - last) >= self.every):
+            self.submit(board, generation)
+        return collected
+
+    def close(self):
+        """Stop the worker process."""
+        if self.pending is not None:
+            self.pending.cancel()
+        self.executor.shutdown(wait=False)
+
+
+# Object code -> name, for the objects drawn in OBJECT_PICTURES
+OBJECT_NAMES = {
+    object_code(picture_cells(picture)): name
+    for name, picture in OBJECT_PICTURES.items()
+}
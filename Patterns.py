@@ -0,0 +1,364 @@
+import re
+from itertools import chain, islice
+
+import numpy as np
+
+# Bytes read from a pattern file at a time
+CHUNK_SIZE = 1 << 16
+
+# Runs brought to life on a stage at a time while loading
+RUN_BATCH = 1 << 16
+
+# Rows read from a stage at a time while saving
+ROW_BATCH = 256
+
+# Longest line written to an RLE file, as the format recommends
+RLE_LINE_LENGTH = 70
+
+# One RLE token: an optional run count and a cell state, "$" or "!"
+RLE_TOKEN = re.compile(rb"(\d*)([p-y]?[A-Xa-z.$!])")
+# Bytes that can start a token without finishing it
+TOKEN_PREFIX = b"0123456789pqrstuvwxy \t\r\n"
+# One run of live cells in a plaintext row
+PLAINTEXT_RUN = re.compile(rb"[^.\s]+")
+RLE_HEADER = re.compile(
+    r"x\s*=\s*(?P<width>\d+)\s*,\s*y\s*=\s*(?P<height>\d+)"
+    r"(?:\s*,\s*rule\s*=\s*(?P<rule>\S+))?"
+)
+
+
+class RLEReader:
+    def __init__(self, file):
+        """Streaming reader for Run Length Encoded patterns.
+
+        The header is read on creation. runs() then parses the rest of the
+        file CHUNK_SIZE bytes at a time, so even multi-megabyte patterns
+        are never held in memory as text.
+
+        Args:
+            file: File object opened in binary mode
+        """
+        self.file = file
+        self.comments = []  # "#" lines before the header, without the "#"
+        self.width = self.height = 0
+        self.rule = None
+
+        for line in file:
+            text = line.decode("utf-8", "replace").strip()
+            if text.startswith("#"):
+                self.comments.append(text[1:].strip())
+            elif text:
+                header = RLE_HEADER.match(text)
+                if header is None:
+                    raise ValueError(f"Invalid RLE header {text!r}")
+                self.width = int(header["width"])
+                self.height = int(header["height"])
+                self.rule = header["rule"]
+                break
+
+    def runs(self):
+        """Parse the pattern into horizontal runs of live cells.
+
+        Yields:
+            tuple: (row, col, length) of each run of live cells
+        """
+        row = col = 0
+        carry = b""
+        while True:
+            chunk = self.file.read(CHUNK_SIZE)
+            data = carry + chunk
+            # A token at the end of a chunk may continue in the next one
+            end = len(data.rstrip(TOKEN_PREFIX)) if chunk else len(data)
+            carry = data[end:]
+
+            for match in RLE_TOKEN.finditer(data, 0, end):
+                count = int(match[1]) if match[1] else 1
+                tag = match[2]
+                if tag == b"$":
+                    row += count
+                    col = 0
+                elif tag == b"!":
+                    return
+                elif tag in (b"b", b"."):
+                    col += count
+                else:
+                    yield row, col, count
+                    col += count
+            if not chunk:
+                return
+
+
+class PlaintextReader:
+    def __init__(self, file):
+        """Streaming reader for plaintext patterns of "." and "O" rows.
+
+        Args:
+            file: File object opened in binary mode
+        """
+        self.file = file
+        self.comments = []  # "!" lines, without the "!"
+        self.width = self.height = 0
+        self.rule = None
+        self.first_line = None
+
+        for line in file:
+            if line.startswith(b"!"):
+                self.comments.append(line[1:].decode("utf-8", "replace").strip())
+            else:
+                self.first_line = line
+                break
+
+    def runs(self):
+        """Yields (row, col, length) of each run of live cells."""
+        if self.first_line is None:
+            return
+        for row, line in enumerate(chain([self.first_line], self.file)):
+            for match in PLAINTEXT_RUN.finditer(line):
+                yield row, match.start(), match.end() - match.start()
+
+
+class Life106Reader:
+    def __init__(self, file):
+        """Streaming reader for Life 1.06 lists of "x y" live cells.
+
+        Args:
+            file: File object opened in binary mode
+        """
+        self.file = file
+        self.comments = []
+        self.width = self.height = 0
+        self.rule = None
+
+    def runs(self):
+        """Yields (row, col, 1) for each live cell."""
+        for line in self.file:
+            if line.startswith(b"#"):
+                if not line.startswith(b"#Life"):
+                    self.comments.append(line[2:].decode("utf-8", "replace").strip())
+                continue
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) < 2:
+                raise ValueError(f"Invalid Life 1.06 line {line!r}")
+            yield int(fields[1]), int(fields[0]), 1
+
+
+def pattern_reader(file):
+    """Pick the reader for a binary pattern file from its first bytes."""
+    start = file.peek(16)[:16] if hasattr(file, "peek") else b""
+    if start.startswith(b"#Life 1.06"):
+        return Life106Reader(file)
+    if start.startswith(b"!") or start[:1] in (b".", b"O"):
+        return PlaintextReader(file)
+    return RLEReader(file)
+
+
+def run_cells(rows, cols, lengths, bounds=None):
+    """Expand runs of live cells into the rows and columns of every cell.
+
+    Args:
+        rows (numpy.ndarray): Row of each run
+        cols (numpy.ndarray): First column of each run
+        lengths (numpy.ndarray): Number of cells in each run
+        bounds (tuple): (height, width) to clip the cells to, or None to
+                        keep them all
+
+    Returns:
+        tuple: (rows, cols) arrays of the cells, run by run
+    """
+    if bounds is not None:
+        height, width = bounds
+        inside = (rows >= 0) & (rows < height) & (cols < width) & (cols + lengths > 0)
+        rows, cols, lengths = rows[inside], cols[inside], lengths[inside]
+        stops = np.minimum(cols + lengths, width)
+        cols = np.maximum(cols, 0)
+        lengths = stops - cols
+
+    # Offset of every cell from the start of its run
+    offsets = np.arange(lengths.sum()) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    return np.repeat(rows, lengths), np.repeat(cols, lengths) + offsets
+
+
+def load_pattern(stage, file, top=0, left=0):
+    """Stream a pattern onto a stage, keeping the cells already alive.
+
+    Runs are expanded into cells and brought to life with Stage.set_cells
+    a batch at a time, so the board is never copied. Cells off a bounded
+    board are dropped.
+
+    Args:
+        stage (Stage): Stage to draw on
+        file: Path or binary file object of an RLE, plaintext or Life 1.06
+              pattern
+        top (int): Row the pattern's top edge is placed on
+        left (int): Column the pattern's left edge is placed on
+
+    Returns:
+        RLEReader, PlaintextReader or Life106Reader: The reader, holding the
+        pattern's size, rule and comments
+    """
+    if isinstance(file, str):
+        with open(file, "rb") as opened:
+            return load_pattern(stage, opened, top, left)
+
+    reader = pattern_reader(file)
+    runs = reader.runs()
+    bounds = (stage.height, stage.width) if stage.wrap else None
+    while True:
+        batch = np.array(list(islice(runs, RUN_BATCH)), dtype=np.int64)
+        if not len(batch):
+            break
+        rows, cols = run_cells(
+            batch[:, 0] + top, batch[:, 1] + left, batch[:, 2], bounds
+        )
+        stage.set_cells(rows, cols)
+    return reader
+
+
+def board_origin(stage):
+    """(top, left) of what board_rows yields, or None for an empty plane."""
+    if stage.wrap:
+        return 0, 0
+    box = stage.bounding_box()
+    return None if box is None else box[:2]
+
+
+def board_rows(stage):
+    """Stream the rows of a stage's board as bool arrays.
+
+    Rows are read ROW_BATCH at a time with Stage.read_region. An unbounded
+    SparseStage is cut to the bounding box of its live cells.
+
+    Yields:
+        numpy.ndarray: One bool array per row, top to bottom
+    """
+    origin = board_origin(stage)
+    if origin is None:
+        return
+    top, left = origin
+    height, width = board_size(stage)
+    for start in range(0, height, ROW_BATCH):
+        rows = min(ROW_BATCH, height - start)
+        yield from stage.read_region(top + start, left, rows, width)
+
+
+def row_runs(line):
+    """Find the runs of live cells in one row.
+
+    Returns:
+        tuple: (starts, lengths) arrays of every run, left to right
+    """
+    edges = np.flatnonzero(np.diff(line.view(np.int8), prepend=0, append=0))
+    return edges[0::2], edges[1::2] - edges[0::2]
+
+
+def board_size(stage):
+    """(height, width) of what board_rows yields."""
+    if stage.wrap:
+        return stage.height, stage.width
+    box = stage.bounding_box()
+    if box is None:
+        return 0, 0
+    top, left, bottom, right = box
+    return bottom - top + 1, right - left + 1
+
+
+def write_rle(stage, file, comments=()):
+    """Stream a stage's board to a text file as RLE.
+
+    Rows are encoded one at a time and written out in lines of at most
+    RLE_LINE_LENGTH characters, so no text copy of the board is built.
+
+    Args:
+        stage (Stage): Stage to save
+        file: File object opened in text mode
+        comments (iterable): Lines written as "#C" comments
+    """
+    height, width = board_size(stage)
+    for comment in comments:
+        file.write(f"#C {comment}\n")
+    file.write(f"x = {width}, y = {height}, rule = {stage.rule}\n")
+
+    line_length = 0
+    pending_rows = 0  # Row ends not written yet, merged into one "n$"
+
+    def emit(count, tag):
+        nonlocal line_length
+        token = f"{count}{tag}" if count > 1 else tag
+        if line_length + len(token) > RLE_LINE_LENGTH:
+            file.write("\n")
+            line_length = 0
+        file.write(token)
+        line_length += len(token)
+
+    for line in board_rows(stage):
+        starts, lengths = row_runs(line)
+        if len(starts):
+            if pending_rows:
+                emit(pending_rows, "$")
+            col = 0
+            for start, length in zip(starts.tolist(), lengths.tolist()):
+                if start > col:
+                    emit(start - col, "b")
+                emit(length, "o")
+                col = start + length
+            pending_rows = 0
+        pending_rows += 1
+    emit(1, "!")
+    file.write("\n")
+
+
+def write_plaintext(stage, file, comments=()):
+    """Stream a stage's board to a text file as rows of "." and "O".
+
+    Args:
+        stage (Stage): Stage to save
+        file: File object opened in text mode
+        comments (iterable): Lines written as "!" comments
+    """
+    for comment in comments:
+        file.write(f"!{comment}\n")
+    symbols = np.array([ord("."), ord("O")], dtype=np.uint8)
+    for line in board_rows(stage):
+        file.write(symbols[line.view(np.uint8)].tobytes().decode("ascii").rstrip("."))
+        file.write("\n")
+
+
+def write_life106(stage, file, comments=()):
+    """Stream a stage's live cells to a text file as Life 1.06 "x y" lines.
+
+    Args:
+        stage (Stage): Stage to save
+        file: File object opened in text mode
+        comments (iterable): Lines written as "#D" comments
+    """
+    file.write("#Life 1.06\n")
+    for comment in comments:
+        file.write(f"#D {comment}\n")
+    for row, line in enumerate(board_rows(stage)):
+        for col in np.flatnonzero(line).tolist():
+            file.write(f"{col} {row}\n")
+
+
+# File extension -> writer
+PATTERN_WRITERS = {
+    ".rle": write_rle,
+    ".cells": write_plaintext,
+    ".txt": write_plaintext,
+    ".lif": write_life106,
+    ".life": write_life106,
+}
+
+
+def save_pattern(stage, path, comments=()):
+    """Save a stage's board to a pattern file chosen by its extension."""
+    for extension, writer in PATTERN_WRITERS.items():
+        if path.lower().endswith(extension):
+            break
+    else:
+        raise ValueError(f"Unknown pattern file type {path!r}")
+    with open(path, "w") as file:
+        writer(stage, file, comments)
@@ -0,0 +1,101 @@
+import re
+from functools import cached_property, lru_cache
+
+# Conway's Game of Life: birth on 3 neighbors, survival on 2 or 3
+CONWAY = "B3/S23"
+
+RULE_PATTERNS = (
+    re.compile(r"B(?P<birth>\d*)/S(?P<survival>\d*)"),
+    re.compile(r"S(?P<survival>\d*)/B(?P<birth>\d*)"),
+    re.compile(r"(?P<survival>\d*)/(?P<birth>\d*)"),  # Classic S/B notation
+)
+
+
+class Rule:
+    def __init__(self, birth, survival):
+        """Compiled outer-totalistic rule for any stepping engine.
+
+        Args:
+            birth (iterable): Neighbor counts that bring a dead cell to life
+            survival (iterable): Neighbor counts that keep a live cell alive
+        """
+        self.birth = frozenset(birth)
+        self.survival = frozenset(survival)
+        self.rulestring = "B{}/S{}".format(
+            "".join(map(str, sorted(self.birth))),
+            "".join(map(str, sorted(self.survival))),
+        )
+
+        # table[alive][living_neighbors] -> next state of the cell
+        self.table = (
+            tuple(count in self.birth for count in range(9)),
+            tuple(count in self.survival for count in range(9)),
+        )
+        # Same, indexed by the 3x3 block total that includes the cell itself
+        self.total_table = (
+            tuple(total in self.birth for total in range(10)),
+            tuple(total - 1 in self.survival for total in range(10)),
+        )
+
+        # (total, born, survives) for every block total that can give life
+        self.live_totals = tuple(
+            (total, born, survives)
+            for total, (born, survives) in enumerate(zip(*self.total_table))
+            if born or survives
+        )
+
+    def __repr__(self):
+        return f"Rule({self.rulestring!r})"
+
+    def __str__(self):
+        return self.rulestring
+
+    @cached_property
+    def array(self):
+        """table as a (2, 9) bool NumPy array, built on first use."""
+        import numpy as np
+
+        return np.array(self.table, dtype=bool)
+
+
+@lru_cache(maxsize=None)
+def canonical_rule(birth, survival):
+    """Return the one shared Rule for sorted birth/survival count tuples."""
+    return Rule(birth, survival)
+
+
+@lru_cache(maxsize=None)
+def parse_rule(rulestring):
+    """Compile a rule string such as "B36/S23" or "23/36".
+
+    Compiled rules are cached by string, and different spellings of the
+    same rule share one Rule object, so switching rules costs a lookup.
+
+    Args:
+        rulestring (str): Rule in B/S, S/B or classic survival/birth notation
+
+    Returns:
+        Rule: The compiled rule
+    """
+    text = rulestring.strip().upper().replace(" ", "")
+    for pattern in RULE_PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            break
+    else:
+        raise ValueError(f"Invalid rule string {rulestring!r}, expected e.g. 'B3/S23'")
+
+    counts = match["birth"] + match["survival"]
+    if "9" in counts:
+        raise ValueError(f"Invalid rule string {rulestring!r}, counts must be 0-8")
+    return canonical_rule(
+        tuple(sorted(set(map(int, match["birth"])))),
+        tuple(sorted(set(map(int, match["survival"])))),
+    )
+
+
+def compile_rule(rule=CONWAY):
+    """Return a compiled Rule from a rule string or an existing Rule."""
+    if isinstance(rule, Rule):
+        return rule
+    return parse_rule(rule)
@@ -0,0 +1,273 @@
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+from CycleDetector import CycleDetector
+from History import History
+from Patterns import load_pattern, save_pattern
+from Statistics import Statistics
+
+# Read-only view of the simulation handed to the render thread. board is a
+# (height, width) bool array that is never written to again.
+Snapshot = namedtuple(
+    "Snapshot",
+    "board generation population births deaths settled "
+    "history_first_generation history_end_generation "
+    "target_rate achieved_rate behind",
+)
+
+
+class SnapshotQueue:
+    def __init__(self, maxsize=1):
+        """Bounded queue between two threads where the newest item wins.
+
+        Putting into a full queue drops the oldest item instead of
+        blocking, so a fast producer never waits for a slow consumer, and
+        the consumer only ever takes the latest item.
+
+        Args:
+            maxsize (int): Most items held at once
+        """
+        self.items = deque(maxlen=maxsize)
+        self.lock = threading.Lock()
+
+    def put(self, item):
+        with self.lock:
+            self.items.append(item)
+
+    def get_latest(self):
+        """Take the newest item and discard the rest.
+
+        Returns:
+            The newest item, or None if nothing was put since the last call
+        """
+        with self.lock:
+            if not self.items:
+                return None
+            item = self.items[-1]
+            self.items.clear()
+            return item
+
+
+class Simulation(threading.Thread):
+    def __init__(self, stage, target_rate=2.0, publish_interval=1 / 60, catch_up=0.25):
+        """Background thread that steps a stage and publishes snapshots.
+
+        The thread owns the stage and its cycle detector, statistics and
+        history. Other threads never touch them directly: they queue
+        commands with send(), which the thread runs between generations,
+        and read Snapshots from the snapshots queue.
+
+        Generations are scheduled with a fixed-timestep accumulator: each
+        tick adds the elapsed time times target_rate to the generations
+        owed, then steps as many as are owed within one publish_interval
+        and publishes one snapshot, so above the frame rate several
+        generations are drawn as one frame. At most catch_up seconds of
+        generations are owed at once; beyond that they are dropped, and
+        the snapshot reports the target as not met. With no target rate
+        (turbo) every tick steps for a whole publish_interval.
+
+        Args:
+            stage (Stage): Bounded stage to step, owned by the thread from
+                           now on
+            target_rate (float): Generations per second while running, or
+                                 None for as many as fit
+            publish_interval (float): Seconds per tick, normally one frame
+            catch_up (float): Most seconds of missed generations made up
+        """
+        super().__init__(daemon=True)
+        self.stage = stage
+        self.cycle_detector = CycleDetector(stage)
+        self.statistics = Statistics(stage)
+        self.history = History(stage)
+        self.target_rate = target_rate
+        self.publish_interval = publish_interval
+        self.catch_up = catch_up
+
+        self.commands = queue.Queue()  # (function, args) to run on the thread
+        self.snapshots = SnapshotQueue()
+        self.running = False  # Stepping generations
+        self.stopped = False
+        self.owed = 0.0  # Generations due but not yet stepped
+        self.last_tick = time.perf_counter()
+        # (time, generations stepped) of each tick over the last second
+        self.ticks = deque()
+        self.behind = False  # Missed the target rate in the last second
+        self.last_behind = float("-inf")
+        self.last_publish = 0.0
+        self.publish()
+
+    def send(self, function, *args):
+        """Queue a call to run on the simulation thread; safe from any thread.
+
+        Args:
+            function (callable): Usually one of this object's command
+                                 methods, such as toggle_cell or undo
+            *args: Arguments for the call
+        """
+        self.commands.put((function, args))
+
+    def stop(self):
+        """Ask the thread to finish and wait for it."""
+        self.send(setattr, self, "stopped", True)
+        if self.is_alive():
+            self.join()
+
+    @property
+    def achieved_rate(self):
+        """Generations per second stepped over the last second."""
+        if not self.running or len(self.ticks) < 2:
+            return 0.0
+        span = self.ticks[-1][0] - self.ticks[0][0]
+        stepped = sum(generations for moment, generations in self.ticks)
+        return (stepped - self.ticks[-1][1]) / span if span else 0.0
+
+    def publish(self):
+        """Put a snapshot of the current state on the snapshots queue."""
+        board = self.stage.to_array()
+        board.flags.writeable = False
+        self.snapshots.put(
+            Snapshot(
+                board,
+                self.statistics.generation,
+                self.statistics.population,
+                self.statistics.births,
+                self.statistics.deaths,
+                self.cycle_detector.settled,
+                self.history.first_generation,
+                self.history.end_generation,
+                self.target_rate,
+                self.achieved_rate,
+                self.behind,
+            )
+        )
+        self.last_publish = time.perf_counter()
+
+    def wait_time(self):
+        """Seconds until the next tick is due."""
+        now = time.perf_counter()
+        if not self.target_rate:
+            return 0.0
+        if self.target_rate * self.publish_interval >= 1:
+            # Several generations a frame: tick once a frame
+            return self.last_tick + self.publish_interval - now
+        owed = self.owed + (now - self.last_tick) * self.target_rate
+        return (1 - owed) / self.target_rate
+
+    def run(self):
+        while not self.stopped:
+            stepping = self.running and not self.cycle_detector.settled
+            try:
+                if not stepping:
+                    # Nothing to do until a command arrives
+                    command = self.commands.get()
+                else:
+                    wait = self.wait_time()
+                    if wait > 0:
+                        command = self.commands.get(timeout=wait)
+                    else:
+                        command = self.commands.get_nowait()
+            except queue.Empty:
+                command = None
+
+            if command:
+                function, args = command
+                function(*args)
+                self.publish()
+            else:
+                self.tick()
+
+    def tick(self):
+        """Step the generations owed that fit in one tick, then publish."""
+        now = time.perf_counter()
+        deadline = now + self.publish_interval
+        if self.target_rate:
+            self.owed += (now - self.last_tick) * self.target_rate
+            limit = self.target_rate * self.catch_up + 1
+            if self.owed > limit:
+                # Too far behind to catch up: drop the excess
+                self.owed = limit
+                self.last_behind = now
+        self.last_tick = now
+
+        stepped = 0
+        while self.owed >= 1 or not self.target_rate:
+            self.cycle_detector.step()
+            self.statistics.record()
+            self.history.record_step()
+            stepped += 1
+            if self.target_rate:
+                self.owed -= 1
+            if self.cycle_detector.settled or time.perf_counter() >= deadline:
+                break
+            # Let the render thread take the GIL between generations
+            time.sleep(0)
+
+        self.ticks.append((now, stepped))
+        while self.ticks[0][0] < now - 1:
+            self.ticks.popleft()
+        self.behind = now - self.last_behind < 1
+        if (
+            now - self.last_publish >= self.publish_interval
+            or self.cycle_detector.settled
+        ):
+            self.publish()
+
+    # Commands, run on the simulation thread through send()
+
+    def set_running(self, running):
+        """Start or pause stepping."""
+        if running and not self.running:
+            # Cells may have been edited while paused
+            self.cycle_detector.reset(self.statistics.generation)
+            self.statistics.recount()
+            self.owed = 0.0
+            self.last_tick = time.perf_counter()
+            self.ticks.clear()
+            self.last_behind = float("-inf")
+        self.running = running
+        self.behind = False
+
+    def set_target_rate(self, target_rate):
+        """Change the generations per second, None for as many as fit."""
+        self.target_rate = target_rate
+        self.owed = min(self.owed, 1.0)
+        self.last_behind = float("-inf")
+
+    def toggle_cell(self, row, col):
+        """Flip one cell and record the edit."""
+        alive = not self.stage.current_grid[row][col]
+        self.stage.current_grid[row][col] = alive
+        self.statistics.population += 1 if alive else -1
+        self.history.record_edit(row, col)
+
+    def undo(self):
+        self.apply_change(self.history.undo())
+
+    def redo(self):
+        self.apply_change(self.history.redo())
+
+    def apply_change(self, change):
+        """Bring the statistics in line with an undo or redo."""
+        if change:
+            kind, births, deaths = change
+            self.statistics.population += births - deaths
+            self.statistics.generation = self.history.generation
+
+    def seek(self, generation):
+        """Jump to any recorded generation."""
+        self.history.seek_generation(generation)
+        self.statistics.recount()
+        self.statistics.generation = self.history.generation
+
+    def load(self, path):
+        """Replace the board with a pattern file and start a new history."""
+        self.stage.current_grid = self.stage.blank_grid()
+        load_pattern(self.stage, path)
+        self.statistics.recount()
+        self.history.clear(self.statistics.generation)
+
+    def save(self, path):
+        """Save the board to a pattern file."""
+        save_pattern(self.stage, path)
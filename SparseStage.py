@@ -0,0 +1,173 @@
+from collections import Counter
+
+import numpy as np
+
+from Rule import CONWAY, compile_rule
+from Stage import GridView, Stage
+
+# (row, col) offsets of the 8 neighboring cells
+NEIGHBOR_OFFSETS = tuple(
+    (d_row, d_col) for d_row in (-1, 0, 1) for d_col in (-1, 0, 1) if d_row or d_col
+)
+
+
+class SparseStage(Stage):
+    def __init__(self, height, width, wrap=True, rule=CONWAY):
+        """Initialize a game stage that stores only live cell coordinates.
+
+        Stepping cost scales with the population instead of the board area.
+
+        Args:
+            height (int): Number of rows in the grid. On an unbounded plane
+                this is only the size of the current_grid view.
+            width (int): Number of columns in the grid, as for height
+            wrap (bool): Wrap around the edges like Stage when True, or
+                simulate an unbounded plane when False
+            rule (str): Rule string such as "B3/S23", or a compiled Rule.
+                Rules with B0 are not supported.
+        """
+        self.height = height  # Number of rows
+        self.width = width  # Number of columns
+        self.wrap = wrap
+        self.rule = rule
+        self.live_cells = self.blank_grid()
+
+    @property
+    def current_grid(self):
+        return GridView(self)
+
+    @current_grid.setter
+    def current_grid(self, grid):
+        if isinstance(grid, GridView):
+            rows, cols = grid.stage.live_coordinates()
+            self.live_cells = set(zip(rows.tolist(), cols.tolist()))
+        elif isinstance(grid, (set, frozenset)):
+            self.live_cells = set(grid)
+        else:
+            self.live_cells = {
+                (row, col)
+                for row, cells in enumerate(grid)
+                for col, alive in enumerate(cells)
+                if alive
+            }
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @rule.setter
+    def rule(self, rule):
+        rule = compile_rule(rule)
+        if 0 in rule.birth:
+            # Births with no living neighbors happen away from any live cell
+            raise ValueError(f"{rule} cannot be simulated from live cells alone")
+        self._rule = rule
+
+    @property
+    def population(self):
+        return len(self.live_cells)
+
+    def blank_grid(self):
+        """Create an empty set of live cells.
+
+        Returns:
+            set: Empty set of (row, col) tuples
+        """
+        return set()
+
+    def get_cell(self, row, col):
+        return self.normalize(row, col) in self.live_cells
+
+    def set_cell(self, row, col, alive):
+        cell = self.normalize(row, col)
+        if alive:
+            self.live_cells.add(cell)
+        else:
+            self.live_cells.discard(cell)
+
+    def normalize(self, row, col):
+        """Map a coordinate onto the board, wrapping it when wrap is set."""
+        if self.wrap:
+            return row % self.height, col % self.width
+        return row, col
+
+    def bounding_box(self):
+        """Get the smallest rectangle that contains every live cell.
+
+        Returns:
+            tuple: (top, left, bottom, right) with bottom and right
+                 inclusive, or None when no cell is alive
+        """
+        if not self.live_cells:
+            return None
+        rows = [row for row, col in self.live_cells]
+        cols = [col for row, col in self.live_cells]
+        return min(rows), min(cols), max(rows), max(cols)
+
+    def generate_next_grid(self):
+        """Apply the stage's rule to generate the next generation."""
+        live_cells = self.live_cells
+        rule_table = self.rule.table
+
+        # Tally living neighbors only around cells that are alive
+        if self.wrap:
+            height, width = self.height, self.width
+            counts = Counter(
+                ((row + d_row) % height, (col + d_col) % width)
+                for row, col in live_cells
+                for d_row, d_col in NEIGHBOR_OFFSETS
+            )
+        else:
+            counts = Counter(
+                (row + d_row, col + d_col)
+                for row, col in live_cells
+                for d_row, d_col in NEIGHBOR_OFFSETS
+            )
+
+        # Look up each tallied cell by current state and neighbor count
+        next_cells = {
+            cell
+            for cell, living_neighbors in counts.items()
+            if rule_table[cell in live_cells][living_neighbors]
+        }
+        if 0 in self.rule.survival:
+            # Isolated live cells never appear in the neighbor tally
+            next_cells.update(cell for cell in live_cells if cell not in counts)
+        if self.track_changes:
+            changed = live_cells ^ next_cells
+            self.changed_cells = (
+                [row for row, col in changed],
+                [col for row, col in changed],
+            )
+            self.births = len(next_cells - live_cells)
+            self.deaths = len(changed) - self.births
+        self.live_cells = next_cells
+
+    def read_region(self, top, left, height, width):
+        bottom, right = top + height, left + width
+        if self.wrap:
+            top, left = max(top, 0), max(left, 0)
+            bottom, right = min(bottom, self.height), min(right, self.width)
+        region = np.zeros((max(bottom - top, 0), max(right - left, 0)), dtype=bool)
+        rows, cols = self.live_coordinates()
+        inside = (rows >= top) & (rows < bottom) & (cols >= left) & (cols < right)
+        region[rows[inside] - top, cols[inside] - left] = True
+        return region
+
+    def from_array(self, board):
+        rows, cols = np.nonzero(board)
+        self.live_cells = set(zip(rows.tolist(), cols.tolist()))
+
+    def live_coordinates(self):
+        cells = np.array(list(self.live_cells), dtype=np.int64).reshape(-1, 2)
+        return cells[:, 0], cells[:, 1]
+
+    def set_cells(self, rows, cols):
+        rows, cols = np.asarray(rows).tolist(), np.asarray(cols).tolist()
+        self.live_cells.update(map(self.normalize, rows, cols))
+
+    def flip(self, rows, cols):
+        rows, cols = np.asarray(rows).tolist(), np.asarray(cols).tolist()
+        flipped = set(zip(rows, cols))
+        self.live_cells ^= flipped
+        return len(flipped & self.live_cells)
@@ -1,16 +1,102 @@
+import importlib
+
+from Rule import CONWAY, compile_rule
+
+# Stepping engines selectable by name. Each maps to (module, class) and is
+# imported lazily, so optional dependencies such as NumPy are only needed
+# when that backend is actually requested.
+BACKENDS = {
+    "python": ("Stage", "Stage"),
+    "numpy": ("NumpyStage", "NumpyStage"),
+    "bits": ("BitStage", "BitStage"),
+    "sparse": ("SparseStage", "SparseStage"),
+    "tiled": ("TiledStage", "TiledStage"),
+    "striped": ("StripedStage", "StripedStage"),
+    "lookup": ("LookupStage", "LookupStage"),
+}
+
+
+class GridRow:
+    def __init__(self, stage, row):
+        """View of one row of a stage that reads and writes single cells.
+
+        Args:
+            stage (Stage): Stage providing get_cell and set_cell
+            row (int): Row of the view
+        """
+        self.stage = stage
+        self.row = row
+
+    def __len__(self):
+        return self.stage.width
+
+    def __getitem__(self, col):
+        return self.stage.get_cell(self.row, col)
+
+    def __setitem__(self, col, alive):
+        self.stage.set_cell(self.row, col, alive)
+
+    def __iter__(self):
+        return (self[col] for col in range(self.stage.width))
+
+
+class GridView:
+    def __init__(self, stage):
+        """Row-indexable view of a stage, so grid[row][col] keeps working.
+
+        Engines whose cells are not stored as rows of booleans return this
+        as their current_grid and define get_cell(row, col) and
+        set_cell(row, col, alive) on their own storage.
+
+        Args:
+            stage (Stage): Stage whose cells are exposed
+        """
+        self.stage = stage
+
+    def __len__(self):
+        return self.stage.height
+
+    def __getitem__(self, row):
+        return GridRow(self.stage, row)
+
+    def __iter__(self):
+        return (self[row] for row in range(self.stage.height))
+
+
 class Stage:
-    def __init__(self, height, width):
+    # When track_changes is set, each generation stores the cells that
+    # flipped as changed_cells = (rows, cols), two equal-length sequences,
+    # and how many of them were births and deaths
+    track_changes = False
+    changed_cells = ((), ())
+    births = 0
+    deaths = 0
+    # Every engine wraps around its edges, except an unbounded SparseStage
+    wrap = True
+
+    def __init__(self, height, width, rule=CONWAY):
         """Initialize the game stage.
 
         Args:
             height (int): Number of rows in the grid
             width (int): Number of columns in the grid
+            rule (str): Rule string such as "B3/S23", or a compiled Rule
         """
         self.height = height  # Number of rows
         self.width = width  # Number of columns
+        self.rule = rule
         self.current_grid = self.blank_grid()
         self.next_grid = self.blank_grid()
 
+    @property
+    def rule(self):
+        return self._rule
+
+    @rule.setter
+    def rule(self, rule):
+        # Rule strings are compiled once and cached, so switching is free
+        self._rule = compile_rule(rule)
+
     def blank_grid(self):
         """Create an empty grid with the correct dimensions.
 
@@ -45,30 +131,225 @@ class Stage:
         ]
 
     def generate_next_grid(self):
-        """Apply Conway's Game of Life rules to generate the next generation."""
+        """Apply the stage's rule to generate the next generation.
+
+        The new generation is written into next_grid, and the two buffers
+        are then swapped by reference, so stepping allocates no grid, row
+        or neighbor list. Wraparound uses negative indexes: row - 1 and
+        row + 1 - height always land on a valid row.
+        """
+        current_grid = self.current_grid
+        next_grid = self.next_grid
+        height, width = self.height, self.width
+        rule_table = self.rule.table
+        track_changes = self.track_changes
+        if track_changes:
+            changed_rows, changed_cols = [], []
+            births = 0
+
         # Check each cell in the grid
-        for row in range(self.height):
-            for col in range(self.width):
+        for row in range(height):
+            above = current_grid[row - 1]
+            cells = current_grid[row]
+            below = current_grid[row + 1 - height]
+            next_row = next_grid[row]
+
+            for col in range(width):
+                west = col - 1
+                east = col + 1 - width
+
                 # Count living neighbors
-                living_neighbors = sum(
-                    1
-                    for neighbor_row, neighbor_col in self.get_neighbors(row, col)
-                    if self.current_grid[neighbor_row][neighbor_col]
+                living_neighbors = (
+                    above[west]
+                    + above[col]
+                    + above[east]
+                    + cells[west]
+                    + cells[east]
+                    + below[west]
+                    + below[col]
+                    + below[east]
                 )
 
-                # Apply Conway's rules
-                current_cell = self.current_grid[row][col]
-                if current_cell:
-                    # Living cell survives if it has 2 or 3 neighbors
-                    self.next_grid[row][col] = living_neighbors in (2, 3)
-                else:
-                    # Dead cell becomes alive if it has exactly 3 neighbors
-                    self.next_grid[row][col] = living_neighbors == 3
-
-        # Update current grid with the new generation
-        for row in range(self.height):
-            for col in range(self.width):
-                self.current_grid[row][col] = self.next_grid[row][col]
-
-        # Reset the next grid
-        self.next_grid = self.blank_grid()
+                # Look up the next state by current state and neighbor count
+                alive = rule_table[cells[col]][living_neighbors]
+                next_row[col] = alive
+                if track_changes and alive != cells[col]:
+                    changed_rows.append(row)
+                    changed_cols.append(col)
+                    births += alive
+
+        if track_changes:
+            self.changed_cells = (changed_rows, changed_cols)
+            self.births = births
+            self.deaths = len(changed_rows) - births
+
+        # The finished generation becomes current; the old one is reused
+        self.current_grid, self.next_grid = next_grid, current_grid
+
+    # Board access shared by every engine. Each backend overrides these
+    # with versions that work straight on its own storage; the ones here
+    # go through current_grid, so they work for any grid of rows.
+
+    def read_region(self, top, left, height, width):
+        """Copy one rectangle of the board into a bool array.
+
+        Args:
+            top (int): First row of the region
+            left (int): First column of the region
+            height (int): Number of rows in the region
+            width (int): Number of columns in the region
+
+        Returns:
+            numpy.ndarray: (height, width) bool array, clipped to the board
+        """
+        import numpy as np
+
+        rows = range(self.height)[top : top + height]
+        cols = range(self.width)[left : left + width]
+        grid = self.current_grid
+        region = [grid[row][cols.start : cols.stop] for row in rows]
+        return np.array(region, dtype=bool).reshape(len(rows), len(cols))
+
+    def to_array(self):
+        """Copy the whole board into a (height, width) bool array."""
+        return self.read_region(0, 0, self.height, self.width)
+
+    def from_array(self, board):
+        """Replace every cell with a (height, width) bool array."""
+        import numpy as np
+
+        self.current_grid = np.asarray(board, dtype=bool).tolist()
+
+    def from_packed(self, words):
+        """Replace every cell with bit-packed rows.
+
+        Args:
+            words (numpy.ndarray): (height, ceil(width / 64)) uint64 array,
+                                   column col at bit col % 64 of little-endian
+                                   word col // 64, as BitStage stores them
+        """
+        import numpy as np
+
+        packed = np.ascontiguousarray(words).astype("<u8").view(np.uint8)
+        cells = np.unpackbits(packed, axis=1, bitorder="little")
+        self.from_array(cells[:, : self.width].view(bool))
+
+    def live_coordinates(self):
+        """Rows and columns of every live cell.
+
+        Returns:
+            tuple: (rows, cols) sequences of equal length
+        """
+        import numpy as np
+
+        return np.nonzero(self.to_array())
+
+    def bounding_box(self):
+        """Get the smallest rectangle that contains every live cell.
+
+        Returns:
+            tuple: (top, left, bottom, right) with bottom and right
+                 inclusive, or None when no cell is alive
+        """
+        rows, cols = self.live_coordinates()
+        if not len(rows):
+            return None
+        return int(rows.min()), int(cols.min()), int(rows.max()), int(cols.max())
+
+    def set_cells(self, rows, cols):
+        """Bring the given cells to life, leaving the rest as they are.
+
+        Args:
+            rows (sequence): Row of each cell
+            cols (sequence): Column of each cell, same length as rows
+        """
+        grid = self.current_grid
+        for row, col in zip(rows, cols):
+            grid[row][col] = True
+
+    def flip(self, rows, cols):
+        """Toggle the given cells, at a cost proportional to their number.
+
+        Args:
+            rows (sequence): Row of each cell to toggle
+            cols (sequence): Column of each cell, same length as rows
+
+        Returns:
+            int: How many of the toggled cells are now alive
+        """
+        grid = self.current_grid
+        births = 0
+        for row, col in zip(rows, cols):
+            alive = not grid[row][col]
+            grid[row][col] = alive
+            births += alive
+        return births
+
+
+def create_stage(height, width, backend="python", **options):
+    """Create a game stage using the named stepping backend.
+
+    Args:
+        height (int): Number of rows in the grid
+        width (int): Number of columns in the grid
+        backend (str): Key of BACKENDS selecting the stepping engine
+        **options: Extra keyword arguments for the backend's constructor
+
+    Returns:
+        Stage: Object exposing current_grid and generate_next_grid()
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend {backend!r}, expected one of {sorted(BACKENDS)}"
+        )
+    module_name, class_name = BACKENDS[backend]
+    stage_class = getattr(importlib.import_module(module_name), class_name)
+    return stage_class(height, width, **options)
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import tracemalloc
+
+    def measure_steps(stage, generations):
+        """Step a stage under tracemalloc.
+
+        Returns:
+            tuple: (bytes still allocated after the steps, peak bytes above
+                   that while stepping)
+        """
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for generation in range(generations):
+            stage.generate_next_grid()
+        after = tracemalloc.take_snapshot()
+
+        # Peak is measured on a second run, free of the snapshots' own memory
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for generation in range(generations):
+            stage.generate_next_grid()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # tracemalloc's own blocks for the first snapshot are not the stage's
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(ignore).compare_to(
+            before.filter_traces(ignore), "filename"
+        )
+        return sum(stat.size_diff for stat in stats), peak - base
+
+    # Check that steady-state stepping allocates nothing: after a warm-up
+    # generation, twenty more must leave no memory behind, and never hold
+    # even one row's worth of temporaries
+    stage = Stage(64, 300)
+    stage.current_grid = [
+        [random.random() < 0.3 for col in range(stage.width)]
+        for row in range(stage.height)
+    ]
+    stage.generate_next_grid()
+    retained, peak = measure_steps(stage, 20)
+    print(f"retained {retained} bytes, peak {peak} bytes while stepping")
+    assert retained == 0, "stepping allocated memory that outlived a generation"
+    assert peak < sys.getsizeof(stage.current_grid[0]), "stepping allocated rows"
@@ -0,0 +1,201 @@
+import numpy as np
+
+
+class TimeSeries:
+    def __init__(self, capacity=1024, factor=4, levels=10):
+        """Fixed-size history of one value per generation at several resolutions.
+
+        Level 0 keeps the last capacity values as they were recorded. Each
+        bucket of level k + 1 summarizes factor buckets of level k by their
+        minimum, maximum and mean, so level k reaches back
+        capacity * factor ** k generations in the same fixed memory. Each
+        level is a ring buffer, and a value is folded into a coarser level
+        only when a bucket fills up, so recording is amortized O(1).
+
+        Args:
+            capacity (int): Buckets kept per level
+            factor (int): Buckets of one level merged into one of the next
+            levels (int): Number of resolutions kept
+        """
+        self.capacity = capacity  # Number of buckets per level
+        self.factor = factor  # Generations per bucket grow by this per level
+        self.levels = levels  # Number of resolutions
+
+        # Ring buffers indexed [level, slot]; starts holds each bucket's first
+        # generation, -1 marking an unused slot
+        shape = (levels, capacity)
+        self.starts = np.full(shape, -1, dtype=np.int64)
+        self.lows = np.zeros(shape)
+        self.highs = np.zeros(shape)
+        self.means = np.zeros(shape)
+        self.filled = [0] * levels  # Buckets written to each level so far
+
+        # Bucket still being gathered for each coarser level:
+        # [first generation, low, high, total, buckets merged]
+        self.pending = [None] * levels
+
+    def __len__(self):
+        return self.filled[0]
+
+    def append(self, generation, value):
+        """Record the value of one generation.
+
+        Args:
+            generation (int): Generation the value belongs to
+            value (float): The value, e.g. the population
+        """
+        self.store(0, generation, value, value, value)
+
+    def store(self, level, start, low, high, mean):
+        """Write a finished bucket to a level and fold it into the next one."""
+        slot = self.filled[level] % self.capacity
+        self.starts[level, slot] = start
+        self.lows[level, slot] = low
+        self.highs[level, slot] = high
+        self.means[level, slot] = mean
+        self.filled[level] += 1
+
+        level += 1
+        if level == self.levels:
+            return
+        pending = self.pending[level]
+        if pending is None:
+            pending = self.pending[level] = [start, low, high, 0.0, 0]
+        pending[1] = min(pending[1], low)
+        pending[2] = max(pending[2], high)
+        pending[3] += mean
+        pending[4] += 1
+        if pending[4] == self.factor:
+            self.pending[level] = None
+            self.store(
+                level, pending[0], pending[1], pending[2], pending[3] / self.factor
+            )
+
+    def level_arrays(self, level):
+        """Buckets held at one level in generation order, newest partial one last.
+
+        Returns:
+            tuple: (starts, lows, highs, means) arrays, oldest first
+        """
+        count = min(self.filled[level], self.capacity)
+        order = (
+            np.arange(self.filled[level] - count, self.filled[level]) % self.capacity
+        )
+        starts = self.starts[level, order]
+        lows = self.lows[level, order]
+        highs = self.highs[level, order]
+        means = self.means[level, order]
+
+        # Include the bucket still being gathered, so the newest generations
+        # show at every level
+        pending = self.pending[level]
+        if pending is not None:
+            start, low, high, total, merged = pending
+            starts = np.append(starts, start)
+            lows = np.append(lows, low)
+            highs = np.append(highs, high)
+            means = np.append(means, total / merged)
+        return starts, lows, highs, means
+
+    def series(self, start=0, stop=None, max_points=None):
+        """Summarize a range of generations in at most max_points buckets.
+
+        The finest level that still reaches back to start and needs no
+        more than max_points buckets over the range is used, so plotting a
+        long run touches a bounded number of values.
+
+        Args:
+            start (int): First generation wanted
+            stop (int): Generation after the last one wanted, default all
+            max_points (int): Most buckets to return, default capacity
+
+        Returns:
+            tuple: (starts, lows, highs, means) arrays, oldest first
+        """
+        max_points = max_points or self.capacity
+        if not self.filled[0]:
+            return self.level_arrays(0)
+        if stop is None:
+            stop = self.starts[0, (self.filled[0] - 1) % self.capacity] + 1
+        for level in range(self.levels):
+            starts, lows, highs, means = self.level_arrays(level)
+            span = self.factor**level
+            reaches_back = len(starts) and starts[0] <= start
+            if (reaches_back or level == self.levels - 1) and (
+                stop - start
+            ) <= max_points * span:
+                break
+        keep = (starts + span > start) & (starts < stop)
+        return starts[keep], lows[keep], highs[keep], means[keep]
+
+
+class Statistics:
+    def __init__(self, stage, capacity=1024, factor=4, levels=10):
+        """Keep population, births and deaths of a stage as it is stepped.
+
+        The population is counted once and then moved on by the births and
+        deaths each engine reports from its own step, so no generation is
+        scanned again. Every series is kept in a TimeSeries ring buffer.
+
+        Args:
+            stage (Stage): Stage to follow; its change tracking is switched on
+            capacity (int): Buckets kept per resolution of each series
+            factor (int): Generations per bucket grow by this per resolution
+            levels (int): Number of resolutions kept
+        """
+        self.stage = stage
+        stage.track_changes = True
+        self.population_history = TimeSeries(capacity, factor, levels)
+        self.birth_history = TimeSeries(capacity, factor, levels)
+        self.death_history = TimeSeries(capacity, factor, levels)
+        self.generation = 0
+        self.births = 0  # Cells born in the last generation
+        self.deaths = 0  # Cells that died in the last generation
+        self.recount()
+        self.population_history.append(0, self.population)
+        self.birth_history.append(0, 0)
+        self.death_history.append(0, 0)
+
+    def recount(self):
+        """Count the population from scratch, e.g. after cells were edited."""
+        self.population = len(self.stage.live_coordinates()[0])
+
+    @property
+    def growth_rate(self):
+        """Relative population change over the last generation."""
+        previous = self.population - self.births + self.deaths
+        if not previous:
+            return 0.0
+        return (self.births - self.deaths) / previous
+
+    def record(self):
+        """Take the counts of the generation the stage has just stepped to."""
+        self.births = self.stage.births
+        self.deaths = self.stage.deaths
+        self.population += self.births - self.deaths
+        self.generation += 1
+        self.population_history.append(self.generation, self.population)
+        self.birth_history.append(self.generation, self.births)
+        self.death_history.append(self.generation, self.deaths)
+
+
+if __name__ == "__main__":
+    import time
+
+    from NumpyStage import NumpyStage
+
+    # Record a long run and summarize it for a 512-point plot
+    stage = NumpyStage(256, 256)
+    stage.current_grid = np.random.default_rng(1).random((256, 256)) < 0.3
+    statistics = Statistics(stage)
+    start = time.perf_counter()
+    for generation in range(5000):
+        stage.generate_next_grid()
+        statistics.record()
+    elapsed = time.perf_counter() - start
+    print(f"{5000 / elapsed:,.0f} gen/s with statistics")
+
+    start = time.perf_counter()
+    starts, lows, highs, means = statistics.population_history.series(max_points=512)
+    elapsed = time.perf_counter() - start
+    print(f"{len(starts)} points from generation {starts[0]} in {elapsed * 1e3:.2f} ms")
@@ -1,5 +1,6 @@
 import pygame
 from Stage import Stage
+from CycleDetector import CycleDetector
 import random
 import time
 from pygame.locals import *
@@ -23,6 +24,9 @@ for row in range(ROWS):
     for col in range(COLS):
         stage.current_grid[row][col] = random.random() < 0.5
 
+# Spots when the board dies out or stops changing
+cycle_detector = CycleDetector(stage)
+
 screen = pygame.display.set_mode(WINDOW_SIZE)
 clock = pygame.time.Clock()
 
@@ -57,10 +61,14 @@ while running:
     # Update display
     pygame.display.flip()
 
-    # Check if enough time has passed to generate the next generation
+    # Check if enough time has passed to generate the next generation,
+    # unless the board is dead or a still life and would never change
     current_time = time.time()
-    if current_time - last_generation_time >= GENERATION_DELAY:
-        stage.generate_next_grid()
+    if (
+        current_time - last_generation_time >= GENERATION_DELAY
+        and not cycle_detector.settled
+    ):
+        cycle_detector.step()
         last_generation_time = current_time
 
     # Maintain frame rate
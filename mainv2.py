@@ -1,6 +1,12 @@
+import os
+import numpy as np
 import pygame
 import sys
-import time
+from collections import Counter
+from FrameTimer import FrameTimer
+from Library import PatternLibrary
+from Objects import OBJECT_NAMES, ObjectTracker
+from Simulation import Simulation
 from Stage import Stage
 from pygame.locals import *
 
@@ -17,7 +23,15 @@ COLS = WINDOW_WIDTH // GRID_SIZE
 ROWS = WINDOW_HEIGHT // GRID_SIZE
 
 FRAME_RATE = FPS  # How many frames per second to render
-GENERATION_DELAY = 0.5  # Time between generations in seconds
+GENERATIONS_PER_SECOND = 2  # Starting speed; + and - double or halve it
+SPEED_LIMITS = (0.5, 16384)  # Slowest and fastest speeds + and - reach
+PATTERN_FILE = "pattern.rle"  # Saved with S and loaded with O while paused
+LIBRARY_FILE = "library.json"  # Pattern library index searched with F
+OBJECT_COUNT_INTERVAL = 10  # Generations between object counts shown with C
+# Fraction of changed cells above which the whole screen is redrawn
+FULL_REDRAW_FRACTION = 0.25
+# Phases of a game frame timed for the performance overlay (F3)
+FRAME_PHASES = ("events", "snapshot", "grid", "cells", "overlay", "flip", "wait")
 
 # Colors
 WHITE = (255, 255, 255)
@@ -89,6 +103,7 @@ class Slider:
         text_surface = self.font.render(f"{self.text}: {int(self.value)}", True, WHITE)
         text_rect = text_surface.get_rect(bottomleft=(self.rect.x, self.rect.y - 5))
         screen.blit(text_surface, text_rect)
+        return self.rect.union(text_rect)
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -110,6 +125,157 @@ class Slider:
         return False
 
 
+class PerformanceHUD:
+    def __init__(self, frame_timer, font_size=24):
+        """Overlay of frame rate, frame times and time spent per phase.
+
+        Args:
+            frame_timer (FrameTimer): Timer the game loop feeds
+            font_size (int): Size of the overlay text
+        """
+        self.frame_timer = frame_timer
+        self.font = pygame.font.Font(None, font_size)
+        self.width = 300
+
+    def draw(self, screen):
+        timer = self.frame_timer
+        p50, p95, p99 = timer.percentiles()
+        lines = [
+            f"FPS {timer.fps:.1f}  Gen/s {timer.generations_per_second:.1f}",
+            f"Frame ms p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}",
+        ]
+        lines += [f"{phase:>8} {share:6.1%}" for phase, share in timer.shares().items()]
+
+        line_height = self.font.get_linesize()
+        histogram_height = 40
+        left = WINDOW_WIDTH - self.width - 10
+        panel = pygame.Rect(
+            left, 10, self.width, len(lines) * line_height + histogram_height + 20
+        )
+        pygame.draw.rect(screen, BLACK, panel)
+        pygame.draw.rect(screen, GRAY, panel, 1)
+        for index, line in enumerate(lines):
+            text_surface = self.font.render(line, True, WHITE)
+            screen.blit(text_surface, (left + 5, 15 + index * line_height))
+
+        # Frame time histogram along the bottom of the panel
+        counts, edges = timer.histogram()
+        if counts.any():
+            bar_width = (self.width - 10) // len(counts)
+            bottom = panel.bottom - 5
+            for index, count in enumerate(counts.tolist()):
+                bar_height = round(histogram_height * count / counts.max())
+                pygame.draw.rect(
+                    screen,
+                    GRAY,
+                    (
+                        left + 5 + index * bar_width,
+                        bottom - bar_height,
+                        bar_width - 1,
+                        bar_height,
+                    ),
+                )
+        return panel
+
+
+class GridRenderer:
+    def __init__(self, screen, full_redraw_fraction=FULL_REDRAW_FRACTION):
+        """Draws boards on the screen, repainting only the cells that changed.
+
+        The grid is kept on an off-screen canvas together with the board
+        it shows. Each frame only the cells that differ from that board
+        are repainted on the canvas and copied to the screen, the areas
+        last frame's overlays covered are restored from the canvas, and
+        just those rectangles are pushed with pygame.display.update(rects).
+        When more than full_redraw_fraction of the cells changed, or the
+        window needs repainting, the whole grid is redrawn and flipped.
+
+        Args:
+            screen (pygame.Surface): Display surface to draw on
+            full_redraw_fraction (float): Fraction of changed cells above
+                                          which the whole grid is redrawn
+        """
+        self.screen = screen
+        self.canvas = pygame.Surface(screen.get_size())  # Grid without overlays
+        self.full_redraw_fraction = full_redraw_fraction
+        self.board = None  # Board drawn on the canvas
+        self.overlay_rects = []  # Screen areas overlays covered last frame
+        self.full_redraw = True  # Redraw everything this frame
+        self.dirty_cells = ((), ())  # (rows, cols) to repaint this frame
+
+    def invalidate(self):
+        """Redraw the whole grid next frame, e.g. after a window expose."""
+        self.board = None
+
+    def draw_grid(self, board):
+        """Pick the cells to repaint, drawing the grid lines on a full redraw.
+
+        Args:
+            board (numpy.ndarray): (ROWS, COLS) bool array to show
+        """
+        previous, self.board = self.board, board
+        self.full_redraw = previous is None or previous.shape != board.shape
+        if not self.full_redraw:
+            changed = board != previous
+            self.full_redraw = (
+                np.count_nonzero(changed) > self.full_redraw_fraction * changed.size
+            )
+        if self.full_redraw:
+            self.canvas.fill(BLACK)
+            for x in range(0, WINDOW_WIDTH, GRID_SIZE):
+                pygame.draw.line(self.canvas, GRAY, (x, 0), (x, WINDOW_HEIGHT))
+            for y in range(0, WINDOW_HEIGHT, GRID_SIZE):
+                pygame.draw.line(self.canvas, GRAY, (0, y), (WINDOW_WIDTH, y))
+            self.dirty_cells = np.nonzero(board)
+        else:
+            self.dirty_cells = np.nonzero(changed)
+
+    def draw_cells(self):
+        """Paint the cells picked by draw_grid and copy them to the screen.
+
+        Returns:
+            list: Screen rects that changed, empty after a full redraw,
+            which is flipped as a whole
+        """
+        rects = []
+        for row, col in zip(*self.dirty_cells):
+            rect = pygame.Rect(col * GRID_SIZE, row * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+            if self.board[row, col]:
+                pygame.draw.rect(self.canvas, RED, rect)
+            else:
+                # A dead cell shows its top and left grid lines
+                pygame.draw.rect(self.canvas, BLACK, rect)
+                pygame.draw.line(
+                    self.canvas, GRAY, rect.topleft, (rect.right - 1, rect.top)
+                )
+                pygame.draw.line(
+                    self.canvas, GRAY, rect.topleft, (rect.left, rect.bottom - 1)
+                )
+            rects.append(rect)
+
+        if self.full_redraw:
+            self.screen.blit(self.canvas, (0, 0))
+            return []
+        # Overlays may have moved or gone, so uncover the grid under them
+        rects += self.overlay_rects
+        for rect in rects:
+            self.screen.blit(self.canvas, rect, rect)
+        return rects
+
+    def present(self, rects, overlay_rects):
+        """Push this frame to the display.
+
+        Args:
+            rects (list): Rects returned by draw_cells
+            overlay_rects (list): Rects of everything drawn over the grid
+        """
+        if self.full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects + overlay_rects)
+        self.overlay_rects = overlay_rects
+
+
 class Menu:
 
     def __init__(self):
@@ -176,22 +342,129 @@ class Menu:
 
     def start_game(self):
         clock = pygame.time.Clock()
-        last_generation_time = time.time()
         stage = Stage(ROWS, COLS)
         stage.current_grid = stage.blank_grid()
+        # Steps the stage on its own thread; this loop only draws snapshots
+        simulation = Simulation(stage, GENERATIONS_PER_SECOND, 1 / FRAME_RATE)
+        target_rate = GENERATIONS_PER_SECOND
+        turbo = False  # Step as many generations as fit in each frame
+        snapshot = simulation.snapshots.get_latest()
+        simulation.start()
+        # Scrubs through the recorded history while paused
+        timeline_slider = Slider(
+            PLAY_BUTTON.right + 40,
+            PLAY_BUTTON.y + 24,
+            WINDOW_WIDTH - PLAY_BUTTON.right - 60,
+            12,
+            0,
+            1,
+            0,
+            "Timeline",
+        )
+        stats_font = pygame.font.Font(None, 28)
+        library = PatternLibrary(LIBRARY_FILE)
+        selection_start = None  # Cell where a right-button drag began
+        selection = None  # (top, left, bottom, right) cells, inclusive
+        library_message = ""
+        # Classifies snapshots in a worker process while counting is on (C)
+        object_tracker = ObjectTracker(stage.rule)
+        object_message = ""
         simulation_running = False
+        frame_timer = FrameTimer(FRAME_PHASES)
+        performance_hud = PerformanceHUD(frame_timer)
+        renderer = GridRenderer(self.screen)
 
         running = True
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
+                # The window was uncovered, so nothing on it can be trusted
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    renderer.invalidate()
+                # Show or hide the performance overlay
+                elif event.type == pygame.KEYDOWN and event.key == K_F3:
+                    frame_timer.enabled = not frame_timer.enabled
+                # Speed controls: + and - change the target speed, T is turbo
+                elif event.type == pygame.KEYDOWN and event.key in (
+                    K_PLUS,
+                    K_EQUALS,
+                    K_KP_PLUS,
+                    K_MINUS,
+                    K_KP_MINUS,
+                    K_t,
+                ):
+                    if event.key == K_t:
+                        turbo = not turbo
+                    else:
+                        faster = event.key in (K_PLUS, K_EQUALS, K_KP_PLUS)
+                        slowest, fastest = SPEED_LIMITS
+                        target_rate = min(
+                            max(target_rate * (2 if faster else 0.5), slowest),
+                            fastest,
+                        )
+                        turbo = False
+                    simulation.send(
+                        simulation.set_target_rate, None if turbo else target_rate
+                    )
+                # Turn the running count of objects on the board on or off
+                elif event.type == pygame.KEYDOWN and event.key == K_c:
+                    if object_tracker.every:
+                        object_tracker.every = 0
+                    else:
+                        object_tracker.every = OBJECT_COUNT_INTERVAL
+                        object_tracker.submit(snapshot.board, snapshot.generation)
+                    object_message = ""
+                # Jump to the generation picked on the timeline while paused
+                elif not simulation_running and timeline_slider.handle_event(event):
+                    simulation.send(simulation.seek, round(timeline_slider.value))
+                # Keyboard shortcuts while paused: save, open, undo and redo
+                elif event.type == pygame.KEYDOWN and not simulation_running:
+                    if event.key == K_s:
+                        simulation.send(simulation.save, PATTERN_FILE)
+                    elif event.key == K_o and os.path.exists(PATTERN_FILE):
+                        simulation.send(simulation.load, PATTERN_FILE)
+                    elif event.key == K_f and selection:
+                        # Look the selected cells up in the pattern library
+                        top, left, bottom, right = selection
+                        rows, cols = np.nonzero(
+                            snapshot.board[top : bottom + 1, left : right + 1]
+                        )
+                        entry = library.find(rows, cols)
+                        library_message = (
+                            entry["name"] if entry else "Not in the pattern library"
+                        )
+                    elif event.key in (K_LEFT, K_z):
+                        simulation.send(simulation.undo)
+                    elif event.key in (K_RIGHT, K_y):
+                        simulation.send(simulation.redo)
+                # Drag with the right button to select cells
+                elif (
+                    event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+                    and event.button == 3
+                    and event.pos[1] < WINDOW_HEIGHT - BUTTON_HEIGHT
+                ):
+                    cell = (event.pos[1] // GRID_SIZE, event.pos[0] // GRID_SIZE)
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        selection_start = cell
+                    elif selection_start:
+                        start_row, start_col = selection_start
+                        end_row, end_col = cell
+                        selection = (
+                            min(start_row, end_row),
+                            min(start_col, end_col),
+                            max(start_row, end_row),
+                            max(start_col, end_col),
+                        )
+                        selection_start = None
+                        library_message = ""
                 # Handle mouse clicks
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = pygame.mouse.get_pos()
                     # Check if click is on the play button
                     if PLAY_BUTTON.collidepoint(mouse_pos):
                         simulation_running = not simulation_running
+                        simulation.send(simulation.set_running, simulation_running)
                     # If click is in the grid area and simulation isn't running
                     elif (
                         not simulation_running
@@ -201,48 +474,114 @@ class Menu:
                         col = mouse_pos[0] // GRID_SIZE
                         row = mouse_pos[1] // GRID_SIZE
                         # Toggle cell state
-                        stage.current_grid[row][col] = not stage.current_grid[row][col]
-
-            # Clear screen and draw (keeping your existing drawing code)
-            self.screen.fill((0, 0, 0))
-
-            # Draw grid lines
-            for x in range(0, WINDOW_WIDTH, GRID_SIZE):
-                pygame.draw.line(
-                    self.screen, (128, 128, 128), (x, 0), (x, WINDOW_HEIGHT)
+                        simulation.send(simulation.toggle_cell, row, col)
+            frame_timer.lap("events")
+
+            # Take the newest board the simulation has published
+            generations = 0
+            latest = simulation.snapshots.get_latest()
+            if latest:
+                generations = max(latest.generation - snapshot.generation, 0)
+                snapshot = latest
+            # Collect the last object count and send the board for the next
+            if object_tracker.update(snapshot.board, snapshot.generation):
+                kinds = Counter(
+                    OBJECT_NAMES.get(code, code)
+                    for code, *placement in object_tracker.objects
                 )
-            for y in range(0, WINDOW_HEIGHT, GRID_SIZE):
-                pygame.draw.line(
-                    self.screen, (128, 128, 128), (0, y), (WINDOW_WIDTH, y)
+                object_message = f"Generation {object_tracker.generation}: " + (
+                    ", ".join(f"{count} {name}" for name, count in kinds.most_common())
+                    or "no objects"
+                )
+            frame_timer.lap("snapshot")
+
+            # Repaint the cells that changed, or everything if most did
+            renderer.draw_grid(snapshot.board)
+            frame_timer.lap("grid")
+            grid_rects = renderer.draw_cells()
+            frame_timer.lap("cells")
+
+            # Everything drawn over the grid, collected for the display update
+            overlay_rects = []
+
+            # Draw the selection and what the library found for it
+            if selection:
+                top, left, bottom, right = selection
+                selection_rect = pygame.draw.rect(
+                    self.screen,
+                    (255, 255, 0),
+                    (
+                        left * GRID_SIZE,
+                        top * GRID_SIZE,
+                        (right - left + 1) * GRID_SIZE,
+                        (bottom - top + 1) * GRID_SIZE,
+                    ),
+                    2,
+                )
+                overlay_rects.append(selection_rect)
+            if library_message:
+                overlay_rects.append(
+                    self.screen.blit(
+                        stats_font.render(library_message, True, WHITE), (10, 10)
+                    )
+                )
+            if object_tracker.every and object_message:
+                overlay_rects.append(
+                    self.screen.blit(
+                        stats_font.render(object_message, True, WHITE), (10, 34)
+                    )
                 )
-
-            # Draw cells
-            for row in range(ROWS):
-                for col in range(COLS):
-                    if stage.current_grid[row][col]:
-                        rect_x = col * GRID_SIZE
-                        rect_y = row * GRID_SIZE
-                        pygame.draw.rect(
-                            self.screen,
-                            (255, 0, 0),
-                            (rect_x, rect_y, GRID_SIZE, GRID_SIZE),
-                        )
 
             # Draw the play/pause button
             button_color = (0, 255, 0) if simulation_running else (120, 120, 120)
-            pygame.draw.rect(self.screen, button_color, PLAY_BUTTON)
+            overlay_rects.append(
+                pygame.draw.rect(self.screen, button_color, PLAY_BUTTON)
+            )
 
-            pygame.display.flip()
+            # Draw the simulation statistics left of the play button
+            stats_text = stats_font.render(
+                f"Generation {snapshot.generation}  "
+                f"Population {snapshot.population}  "
+                f"Births {snapshot.births}  Deaths {snapshot.deaths}",
+                True,
+                WHITE,
+            )
+            overlay_rects.append(self.screen.blit(stats_text, (10, PLAY_BUTTON.y)))
+
+            # Draw the target speed, in red while it cannot be kept up
+            if snapshot.target_rate is None:
+                speed = f"Speed turbo, {snapshot.achieved_rate:.0f} gen/s"
+            else:
+                speed = f"Speed {snapshot.target_rate:g} gen/s"
+                if snapshot.behind:
+                    speed += f", managing {snapshot.achieved_rate:.0f}"
+            speed_text = stats_font.render(
+                speed, True, RED if snapshot.behind else WHITE
+            )
+            overlay_rects.append(self.screen.blit(speed_text, (10, PLAY_BUTTON.y + 20)))
+
+            # Draw the timeline over every recorded generation
+            timeline_slider.min_val = snapshot.history_first_generation
+            timeline_slider.max_val = max(
+                snapshot.history_end_generation, snapshot.history_first_generation + 1
+            )
+            if not timeline_slider.sliding:
+                timeline_slider.value = snapshot.generation
+            overlay_rects.append(timeline_slider.draw(self.screen))
+
+            if frame_timer.enabled:
+                overlay_rects.append(performance_hud.draw(self.screen))
+            frame_timer.lap("overlay")
 
-            # Only update generations if simulation is running
-            if simulation_running:
-                current_time = time.time()
-                if current_time - last_generation_time >= GENERATION_DELAY:
-                    stage.generate_next_grid()
-                    last_generation_time = current_time
+            renderer.present(grid_rects, overlay_rects)
+            frame_timer.lap("flip")
 
             clock.tick(FRAME_RATE)
+            frame_timer.lap("wait")
+            frame_timer.end_frame(generations)
 
+        simulation.stop()
+        object_tracker.close()
         return
 
     def handle_events(self):
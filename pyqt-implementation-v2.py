@@ -14,6 +14,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QColor
 
+from Rule import CONWAY, compile_rule
+
 
 class GameOfLife(QMainWindow):
     def __init__(self):
@@ -27,6 +29,7 @@ class GameOfLife(QMainWindow):
         self.rows, self.cols = 30, 30
         self.cell_size = 20
         self.is_playing = False
+        self.rule = compile_rule(CONWAY)
 
         # Grid state
         self.grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
@@ -156,30 +159,17 @@ class GameOfLife(QMainWindow):
             self.statusBar().showMessage("Simulation paused")
 
     def evolve(self):
-        """Evolve the grid according to Conway's Game of Life rules"""
+        """Evolve the grid according to the current rule"""
         # Create a new grid
         new_grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
 
-        # Apply Conway's rules
+        # Apply the rule: look up the next state by state and neighbor count
+        rule_table = self.rule.table
         for i in range(self.rows):
             for j in range(self.cols):
                 # Count live neighbors
                 neighbors = self.count_neighbors(i, j)
-
-                # Apply rules
-                if self.grid[i][j] == 1:
-                    # Live cell
-                    if neighbors < 2 or neighbors > 3:
-                        # Dies (underpopulation or overpopulation)
-                        new_grid[i][j] = 0
-                    else:
-                        # Survives
-                        new_grid[i][j] = 1
-                else:
-                    # Dead cell
-                    if neighbors == 3:
-                        # Becomes alive (reproduction)
-                        new_grid[i][j] = 1
+                new_grid[i][j] = int(rule_table[self.grid[i][j]][neighbors])
 
         # Update grid
         self.grid = new_grid
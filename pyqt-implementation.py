@@ -2,6 +2,8 @@ import sys
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QGridLayout, QPushButton
 from PyQt5.QtCore import QTimer, Qt
 
+from Rule import CONWAY, compile_rule
+
 
 class GameOfLife(QMainWindow):
     def __init__(self):
@@ -9,6 +11,7 @@ class GameOfLife(QMainWindow):
 
         self.setWindowTitle("Conway's Game of Life")
         self.rows, self.cols = 20, 20
+        self.rule = compile_rule(CONWAY)
         self.grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
         self.buttons = [[None for _ in range(self.cols)] for _ in range(self.rows)]
 
@@ -50,7 +53,7 @@ class GameOfLife(QMainWindow):
                 )
 
     def evolve(self):
-        # Conway's Game of Life rules implementation
+        # Cellular automaton rule implementation
         new_grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
 
         for i in range(self.rows):
@@ -64,11 +67,8 @@ class GameOfLife(QMainWindow):
                         ni, nj = (i + di) % self.rows, (j + dj) % self.cols
                         neighbors += self.grid[ni][nj]
 
-                # Apply Conway's rules
-                if self.grid[i][j] == 1 and (neighbors == 2 or neighbors == 3):
-                    new_grid[i][j] = 1
-                elif self.grid[i][j] == 0 and neighbors == 3:
-                    new_grid[i][j] = 1
+                # Apply the rule by cell state and neighbor count
+                new_grid[i][j] = int(self.rule.table[self.grid[i][j]][neighbors])
 
         self.grid = new_grid
         self.update_display()